@@ -20,7 +20,15 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 
 # noinspection PyUnresolvedReferences
-from requests.models.request import Request
+from requests.models.request import Request, ArchivedRequest
+# noinspection PyUnresolvedReferences
+from requests.models.outbox_event import OutboxEvent
+# noinspection PyUnresolvedReferences
+from requests.models.request_counter import RequestCounter
+# noinspection PyUnresolvedReferences
+from requests.models.campus_version import CampusVersion
+# noinspection PyUnresolvedReferences
+from requests.models.processed_message import ProcessedMessage
 
 
 from shared.database import Base
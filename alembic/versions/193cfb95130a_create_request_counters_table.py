@@ -0,0 +1,61 @@
+"""Create request counters table
+
+Revision ID: 193cfb95130a
+Revises: 7fac588e9a81
+Create Date: 2026-10-16 14:22:51.447690
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '193cfb95130a'
+down_revision: Union[str, None] = '7fac588e9a81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Os tipos já foram criados junto com a tabela requests
+request_type_enum = postgresql.ENUM(
+    'approve_team',
+    'delete_team',
+    'remove_team_member',
+    'add_team_member',
+    name='requesttypeenum',
+    create_type=False
+)
+request_status_enum = postgresql.ENUM(
+    'pendent',
+    'approved',
+    'rejected',
+    name='requeststatusenum',
+    create_type=False
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('request_counters',
+        sa.Column('campus_code', sa.String(length=100), nullable=False),
+        sa.Column('request_type', request_type_enum, nullable=False),
+        sa.Column('status', request_status_enum, nullable=False),
+        sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('campus_code', 'request_type', 'status')
+    )
+
+    op.execute(
+        """
+        INSERT INTO request_counters (campus_code, request_type, status, count)
+        SELECT campus_code, request_type, status, count(*)
+        FROM requests
+        GROUP BY campus_code, request_type, status
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('request_counters')
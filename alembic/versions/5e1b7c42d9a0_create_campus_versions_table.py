@@ -0,0 +1,40 @@
+"""Create campus versions table
+
+Revision ID: 5e1b7c42d9a0
+Revises: 193cfb95130a
+Create Date: 2026-10-16 23:04:12.518903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1b7c42d9a0'
+down_revision: Union[str, None] = '193cfb95130a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('campus_versions',
+        sa.Column('campus_code', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('campus_code')
+    )
+
+    op.execute(
+        """
+        INSERT INTO campus_versions (campus_code, version)
+        SELECT DISTINCT campus_code, 1
+        FROM requests
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('campus_versions')
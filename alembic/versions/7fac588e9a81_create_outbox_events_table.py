@@ -0,0 +1,36 @@
+"""Create outbox events table
+
+Revision ID: 7fac588e9a81
+Revises: a384ca355a36
+Create Date: 2026-10-16 11:47:05.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7fac588e9a81'
+down_revision: Union[str, None] = 'a384ca355a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_events',
+        sa.Column('id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('routing_key', sa.String(length=255), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_created_at', 'outbox_events', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_events_created_at', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,98 @@
+"""Create requests archive table
+
+Revision ID: 8d3f0a6b2c17
+Revises: 5e1b7c42d9a0
+Create Date: 2026-10-16 23:41:05.207114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f0a6b2c17'
+down_revision: Union[str, None] = '5e1b7c42d9a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Os tipos já foram criados junto com a tabela requests
+request_type_enum = postgresql.ENUM(
+    'approve_team',
+    'delete_team',
+    'remove_team_member',
+    'add_team_member',
+    name='requesttypeenum',
+    create_type=False
+)
+request_status_enum = postgresql.ENUM(
+    'pendent',
+    'approved',
+    'rejected',
+    name='requeststatusenum',
+    create_type=False
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O arquivador seleciona pela data da decisão, não pela de criação
+    op.add_column('requests', sa.Column('decided_at', sa.DateTime(timezone=True), nullable=True))
+    # A data real das decisões anteriores não foi registrada. Usa-se um limite superior (o momento da
+    # migração), para que nenhuma solicitação seja arquivada antes do prazo
+    op.execute("UPDATE requests SET decided_at = now() WHERE status <> 'pendent'")
+
+    op.create_table('requests_archive',
+        sa.Column('id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('request_type', request_type_enum, nullable=False),
+        sa.Column('team_id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('competition_id', sa.UUID(as_uuid=True), nullable=True),
+        sa.Column('user_id', sa.String(), nullable=True),
+        sa.Column('campus_code', sa.String(length=100), nullable=False),
+        sa.Column('reason', sa.String(), nullable=True),
+        sa.Column('reason_rejected', sa.String(), nullable=True),
+        sa.Column('status', request_status_enum, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('decided_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # A tabela nasce vazia, então os índices não precisam ser criados de forma concorrente
+    op.create_index('ix_requests_archive_campus_created', 'requests_archive',
+                    ['campus_code', 'created_at', 'id'])
+    op.create_index('ix_requests_archive_campus_status_created', 'requests_archive',
+                    ['campus_code', 'status', 'created_at', 'id'])
+    op.create_index('ix_requests_archive_campus_type_created', 'requests_archive',
+                    ['campus_code', 'request_type', 'created_at', 'id'])
+    op.create_index('ix_requests_archive_approved_team', 'requests_archive', ['team_id', 'campus_code'],
+                    postgresql_where=sa.text("status = 'approved' AND request_type = 'approve_team'"))
+
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        # Seleção dos lotes do arquivador
+        op.create_index(
+            'ix_requests_decided_at',
+            'requests',
+            ['decided_at'],
+            postgresql_where=sa.text("status <> 'pendent'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        INSERT INTO requests (id, request_type, team_id, competition_id, user_id, campus_code,
+                              reason, reason_rejected, status, created_at, decided_at)
+        SELECT id, request_type, team_id, competition_id, user_id, campus_code,
+               reason, reason_rejected, status, created_at, decided_at
+        FROM requests_archive
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_requests_decided_at', table_name='requests', postgresql_concurrently=True)
+    op.drop_table('requests_archive')
+    op.drop_column('requests', 'decided_at')
@@ -0,0 +1,71 @@
+"""Add requests query indexes
+
+Revision ID: a384ca355a36
+Revises: c3d2768c17bc
+Create Date: 2026-10-16 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a384ca355a36'
+down_revision: Union[str, None] = 'c3d2768c17bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        # Listagem por campus (GET /api/v1/requests) com paginação por (created_at, id)
+        op.create_index(
+            'ix_requests_campus_created',
+            'requests',
+            ['campus_code', 'created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+        # Listagem por campus filtrada por status
+        op.create_index(
+            'ix_requests_campus_status_created',
+            'requests',
+            ['campus_code', 'status', 'created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+        # Listagem por campus filtrada por tipo
+        op.create_index(
+            'ix_requests_campus_type_created',
+            'requests',
+            ['campus_code', 'request_type', 'created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+        # Verificação de solicitação pendente duplicada no consumidor
+        op.create_index(
+            'ix_requests_pending_dedupe',
+            'requests',
+            ['team_id', 'campus_code', 'request_type', 'user_id'],
+            postgresql_where=sa.text("status = 'pendent'"),
+            postgresql_concurrently=True,
+        )
+        # Busca da aprovação prévia da equipe em solicitações de delete_team
+        op.create_index(
+            'ix_requests_approved_team',
+            'requests',
+            ['team_id', 'campus_code'],
+            postgresql_where=sa.text("status = 'approved' AND request_type = 'approve_team'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_requests_approved_team', table_name='requests', postgresql_concurrently=True)
+        op.drop_index('ix_requests_pending_dedupe', table_name='requests', postgresql_concurrently=True)
+        op.drop_index('ix_requests_campus_type_created', table_name='requests', postgresql_concurrently=True)
+        op.drop_index('ix_requests_campus_status_created', table_name='requests', postgresql_concurrently=True)
+        op.drop_index('ix_requests_campus_created', table_name='requests', postgresql_concurrently=True)
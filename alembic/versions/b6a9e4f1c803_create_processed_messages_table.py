@@ -0,0 +1,33 @@
+"""Create processed messages table
+
+Revision ID: b6a9e4f1c803
+Revises: 8d3f0a6b2c17
+Create Date: 2026-10-17 00:18:37.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6a9e4f1c803'
+down_revision: Union[str, None] = '8d3f0a6b2c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('processed_messages',
+        sa.Column('message_key', sa.String(length=64), nullable=False),
+        sa.Column('processed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('message_key')
+    )
+    op.create_index('ix_processed_messages_processed_at', 'processed_messages', ['processed_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('processed_messages')
@@ -1,20 +1,36 @@
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import hashlib
 import os
+import time
 
 from typing import List
 
+from shared.cache import LRUCache
+
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
 ALGORITHM = "HS256"
 
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+TOKEN_CACHE_MAX_TTL = float(os.getenv("AUTH_TOKEN_CACHE_MAX_TTL_SECONDS", "300"))
+
 security = HTTPBearer()
 
-def get_current_user(
+# Tokens já verificados, indexados pelo SHA-256 do token para não guardar o token em memória
+token_cache = LRUCache(TOKEN_CACHE_SIZE)
+
+
+async def get_current_user(
         credentials: HTTPAuthorizationCredentials = Depends(security)
     ):
 
     token = credentials.credentials
+    cache_key = hashlib.sha256(token.encode()).digest()
+
+    cached_user = token_cache.get(cache_key)
+    if cached_user is not None:
+        return cached_user
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -26,14 +42,25 @@ def get_current_user(
         if user_matricula is None or campus is None:
             raise ValueError("Dados incompletos no token")
 
-        return {
+        user = {
             "user_matricula": user_matricula,
             "campus": campus,
             "groups": groups,
         }
 
+        # O token nunca fica no cache além do seu próprio "exp"
+        ttl = TOKEN_CACHE_MAX_TTL
+        exp = payload.get("exp")
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+
+        if ttl > 0:
+            token_cache.set(cache_key, user, ttl=ttl)
+
+        return user
+
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado",
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,281 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Os módulos da aplicação leem as variáveis de ambiente na importação, então `configure_environment`
+precisa ser chamada antes de qualquer import de `shared`, `services`, `messaging` ou `main`.
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+BENCHMARK_JWT_SECRET = "benchmark-secret"
+
+REQUEST_TYPE_WEIGHTS = {
+    "approve_team": 50,
+    "add_team_member": 25,
+    "remove_team_member": 15,
+    "delete_team": 10,
+}
+
+REQUEST_STATUS_WEIGHTS = {
+    "approved": 60,
+    "rejected": 20,
+    "pendent": 20,
+}
+
+
+def configure_environment(database_url: str) -> None:
+    os.environ["SQLALCHEMY_DATABASE_URL"] = database_url
+    os.environ["JWT_SECRET_KEY"] = BENCHMARK_JWT_SECRET
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def campus_codes(count: int) -> list[str]:
+    return [f"CAMPUS{index:02d}" for index in range(1, count + 1)]
+
+
+def campus_weights(count: int) -> list[float]:
+    # Distribuição de Zipf: poucos campi concentram a maior parte das solicitações
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def sign_token(campus_code: str, groups: tuple[str, ...] = ("Organizador",)) -> str:
+    from jose import jwt
+
+    payload = {
+        "matricula": f"bench-{campus_code}",
+        "campus": campus_code,
+        "groups": list(groups),
+        "exp": int(time.time()) + 3600,
+    }
+    return jwt.encode(payload, BENCHMARK_JWT_SECRET, algorithm="HS256")
+
+
+async def reset_schema() -> None:
+    from shared.database import Base, engine
+    import requests.models.outbox_event  # noqa: F401
+    import requests.models.request_counter  # noqa: F401
+    import requests.models.campus_version  # noqa: F401
+    import requests.models.processed_message  # noqa: F401
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+
+async def seed_requests(total: int, campuses: list[str], teams_per_campus: int, rng: random.Random) -> dict:
+    """
+    Grava `total` solicitações distribuídas entre os campi e recalcula `request_counters`.
+
+    Retorna, por campus, os ids gravados e os ids ainda pendentes.
+    """
+    from sqlalchemy import delete, func, insert, select
+
+    from requests.models.request import Request, RequestStatusEnum, RequestTypeEnum
+    from requests.models.request_counter import RequestCounter
+    from shared.database import AsyncSessionLocal
+
+    teams = {campus: [uuid.uuid4() for _ in range(teams_per_campus)] for campus in campuses}
+    competitions = [uuid.uuid4() for _ in range(8)]
+    weights = campus_weights(len(campuses))
+    now = datetime.now(timezone.utc)
+
+    seeded = {campus: {"ids": [], "pending": []} for campus in campuses}
+    rows = []
+
+    for _ in range(total):
+        campus = rng.choices(campuses, weights)[0]
+        request_type = RequestTypeEnum(rng.choices(list(REQUEST_TYPE_WEIGHTS), list(REQUEST_TYPE_WEIGHTS.values()))[0])
+        status = RequestStatusEnum(rng.choices(list(REQUEST_STATUS_WEIGHTS), list(REQUEST_STATUS_WEIGHTS.values()))[0])
+        request_id = uuid.uuid4()
+        created_at = now - timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+
+        rows.append({
+            "id": request_id,
+            "request_type": request_type,
+            "team_id": rng.choice(teams[campus]),
+            "competition_id": rng.choice(competitions),
+            "user_id": str(rng.randint(20200000, 20249999))
+            if request_type in (RequestTypeEnum.add_team_member, RequestTypeEnum.remove_team_member) else None,
+            "campus_code": campus,
+            "reason": None,
+            "reason_rejected": "Equipe incompleta" if status == RequestStatusEnum.rejected else None,
+            "status": status,
+            "created_at": created_at,
+            "decided_at": created_at if status != RequestStatusEnum.pendent else None,
+        })
+
+        seeded[campus]["ids"].append(request_id)
+        if status == RequestStatusEnum.pendent:
+            seeded[campus]["pending"].append(request_id)
+
+    async with AsyncSessionLocal() as db:
+        for start in range(0, len(rows), 1000):
+            await db.execute(insert(Request), rows[start:start + 1000])
+
+        await db.execute(delete(RequestCounter))
+        await db.execute(
+            insert(RequestCounter).from_select(
+                ["campus_code", "request_type", "status", "count"],
+                select(Request.campus_code, Request.request_type, Request.status, func.count())
+                .group_by(Request.campus_code, Request.request_type, Request.status)
+            )
+        )
+        await db.commit()
+
+    return {"teams": teams, "competitions": competitions, "requests": seeded}
+
+
+class QueryCounter:
+    """
+    Conta os comandos SQL enviados ao banco pelo engine da aplicação.
+    """
+
+    def __init__(self):
+        from sqlalchemy import event
+        from shared.database import engine
+
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+class InMemoryExchange:
+    def __init__(self, broker: "InMemoryBroker", name: str):
+        self.broker = broker
+        self.name = name
+
+    async def publish(self, message, routing_key: str, **kwargs) -> None:
+        if self.broker.confirm_latency:
+            import asyncio
+            await asyncio.sleep(self.broker.confirm_latency)
+        self.broker.published[routing_key] = self.broker.published.get(routing_key, 0) + 1
+
+
+class InMemoryQueue:
+    def __init__(self, broker: "InMemoryBroker", name: str):
+        self.broker = broker
+        self.name = name
+
+    async def bind(self, exchange, routing_key: str, **kwargs) -> None:
+        self.broker.bindings[routing_key] = self.name
+
+    async def consume(self, callback, **kwargs) -> str:
+        self.broker.consumers[self.name] = callback
+        return self.name
+
+    async def cancel(self, consumer_tag: str, **kwargs) -> None:
+        self.broker.consumers.pop(consumer_tag, None)
+
+
+class InMemoryChannel:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.is_closed = False
+
+    async def set_qos(self, **kwargs) -> None:
+        pass
+
+    async def declare_exchange(self, name: str, *args, **kwargs) -> InMemoryExchange:
+        return InMemoryExchange(self.broker, name)
+
+    async def declare_queue(self, name: str, *args, **kwargs) -> InMemoryQueue:
+        return InMemoryQueue(self.broker, name)
+
+    async def close(self) -> None:
+        self.is_closed = True
+
+
+class InMemoryConnection:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.is_closed = False
+
+    async def channel(self, **kwargs) -> InMemoryChannel:
+        return InMemoryChannel(self.broker)
+
+    async def close(self) -> None:
+        self.is_closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class InMemoryBroker:
+    """
+    Substituto do RabbitMQ para os benchmarks: aceita conexões, declarações e publicações sem rede.
+
+    `confirm_latency` simula o tempo de confirmação do broker em cada publicação.
+    """
+
+    def __init__(self, confirm_latency: float = 0.0):
+        self.confirm_latency = confirm_latency
+        self.published: dict[str, int] = {}
+        self.bindings: dict[str, str] = {}
+        self.consumers: dict[str, object] = {}
+
+    def install(self) -> None:
+        import aio_pika
+
+        async def connect_robust(*args, **kwargs) -> InMemoryConnection:
+            return InMemoryConnection(self)
+
+        aio_pika.connect_robust = connect_robust
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize_latencies(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    completed = len(latencies)
+    return {
+        "count": completed,
+        "errors": errors,
+        "throughput_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / completed * 1000, 3) if completed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str | None, benchmark: str, config: dict, results: dict) -> dict:
+    report = {
+        "benchmark": benchmark,
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": config,
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w") as file:
+            file.write(output + "\n")
+    print(output)
+    return report
@@ -0,0 +1,64 @@
+"""
+Compara dois resultados de benchmark gravados com `--output`.
+
+Uso:
+    python -m benchmarks.compare baseline.json atual.json [--threshold 10]
+
+Termina com código 1 se alguma métrica piorou mais que `--threshold` por cento.
+"""
+import argparse
+import json
+import sys
+
+# Para estas métricas, valores maiores são melhores; para as demais (latências, erros, consultas), menores
+HIGHER_IS_BETTER = {"throughput_per_s", "speedup"}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    regressed = False
+
+    print(f"{baseline['benchmark']}: {baseline.get('commit')} -> {current.get('commit')}")
+
+    for scenario, metrics in current["results"].items():
+        base_metrics = baseline["results"].get(scenario)
+        if not isinstance(metrics, dict) or not isinstance(base_metrics, dict):
+            continue
+
+        print(f"\n[{scenario}]")
+        for name, value in metrics.items():
+            base_value = base_metrics.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(base_value, (int, float)):
+                continue
+
+            change = (value - base_value) / base_value * 100 if base_value else 0.0
+            worse = -change if name in HIGHER_IS_BETTER else change
+            flag = ""
+            if worse > threshold:
+                flag = "  <-- piora"
+                regressed = True
+
+            print(f"  {name:<24} {base_value:>12} {value:>12} {change:>+8.1f}%{flag}")
+
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    if baseline["benchmark"] != current["benchmark"]:
+        raise SystemExit(f"Benchmarks diferentes: {baseline['benchmark']} e {current['benchmark']}")
+
+    sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
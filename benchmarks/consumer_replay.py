@@ -0,0 +1,361 @@
+"""
+Benchmark do consumidor: reproduz um fluxo de mensagens pelas quatro filas de `messaging.consumers`.
+
+As mensagens são entregues aos callbacks registrados por `main_consumer` em um broker em memória,
+respeitando o prefetch (no máximo `--prefetch` mensagens sem ack por fila). O fluxo pode ser sintético ou
+vir de um arquivo JSONL gravado (`{"routing_key": ..., "body": {...}}` por linha).
+
+Uso:
+    python -m benchmarks.consumer_replay --messages 5000 --output consumidor.json
+    python -m benchmarks.consumer_replay --batch-size 50 --output consumidor_lote.json
+    python -m benchmarks.consumer_replay --fixture mensagens.jsonl
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+from benchmarks.common import configure_environment, campus_codes, campus_weights, summarize_latencies, write_results
+
+ROUTING_KEY_TEAM_CREATION = "team.creation.requested"
+ROUTING_KEY_TEAM_DELETION = "team.deletion.requested"
+ROUTING_KEY_MEMBER_DELETION = "member.removal.requested"
+ROUTING_KEY_MEMBER_ADD = "member.add.requested"
+
+# Caminhos publicados sem message_id: o consumidor identifica a mensagem pelo conteúdo
+WITHOUT_MESSAGE_ID_KINDS = ("new_without_id", "resubmitted_without_id")
+
+
+class ReplayMessage:
+    """
+    Mensagem em memória com a mesma interface de `aio_pika.IncomingMessage` usada pelo consumidor.
+    """
+
+    def __init__(self, routing_key: str, body: bytes, kind: str, on_settle, with_message_id: bool = True):
+        self.routing_key = routing_key
+        self.body = body
+        self.kind = kind
+        self.message_id = str(uuid.uuid4()) if with_message_id else None
+        self.redelivered = False
+        self.headers = {}
+
+        self.delivered_at: float | None = None
+        self.outcome: str | None = None
+        self._on_settle = on_settle
+
+    @property
+    def processed(self) -> bool:
+        return self.outcome is not None
+
+    def _settle(self, outcome: str) -> None:
+        if self.outcome is None:
+            self.outcome = outcome
+            self._on_settle(self, time.perf_counter() - self.delivered_at)
+
+    async def ack(self, **kwargs) -> None:
+        self._settle("acked")
+
+    async def reject(self, requeue: bool = False) -> None:
+        self._settle("rejected")
+
+    async def nack(self, requeue: bool = True, **kwargs) -> None:
+        self._settle("rejected")
+
+    @contextlib.asynccontextmanager
+    async def process(self, requeue: bool = False, ignore_processed: bool = False, **kwargs):
+        try:
+            yield self
+        except Exception:
+            await self.reject(requeue=requeue)
+            raise
+        else:
+            await self.ack()
+
+
+def synthetic_stream(total: int, campuses: list[str], approved_teams: dict, duplicate_ratio: float,
+                     delete_ratio: float, rng: random.Random, redelivery_ratio: float = 0.0,
+                     without_id_ratio: float = 0.0, decided_messages: list[tuple[str, dict]] = (),
+                     resubmission_ratio: float = 0.0) -> list[tuple[str, dict, str]]:
+    """
+    Gera `(routing_key, corpo, caminho)` misturando solicitações novas (com e sem `message_id`), duplicadas de
+    pendentes (reenviadas pelo produtor), reentregas do broker de mensagens já enviadas, reenvios sem
+    `message_id` de solicitações já decididas (`decided_messages`) e exclusões de equipe com e sem aprovação prévia.
+    """
+    weights = campus_weights(len(campuses))
+    sent: list[tuple[str, dict]] = []
+    stream = []
+
+    for _ in range(total):
+        roll = rng.random()
+
+        if sent and roll < duplicate_ratio:
+            routing_key, body = rng.choice(sent)
+            stream.append((routing_key, body, "duplicate"))
+            continue
+
+        if sent and roll < duplicate_ratio + redelivery_ratio:
+            routing_key, body = rng.choice(sent)
+            stream.append((routing_key, body, "redelivered"))
+            continue
+
+        if decided_messages and roll < duplicate_ratio + redelivery_ratio + resubmission_ratio:
+            routing_key, body = rng.choice(decided_messages)
+            stream.append((routing_key, body, "resubmitted_without_id"))
+            continue
+
+        campus = rng.choices(campuses, weights)[0]
+
+        if roll < duplicate_ratio + redelivery_ratio + resubmission_ratio + delete_ratio:
+            # Três em cada quatro exclusões apontam para uma equipe com aprovação prévia
+            if approved_teams[campus] and rng.random() < 0.75:
+                team_id, kind = rng.choice(approved_teams[campus]), "delete_team_approved"
+            else:
+                team_id, kind = uuid.uuid4(), "delete_team_missing_approval"
+            body = {"team_id": str(team_id), "campus_code": campus, "request_type": "delete_team"}
+            stream.append((ROUTING_KEY_TEAM_DELETION, body, kind))
+            continue
+
+        team_id = str(uuid.uuid4())
+        member_roll = rng.random()
+        if member_roll < 0.5:
+            routing_key = ROUTING_KEY_TEAM_CREATION
+            body = {"team_id": team_id, "campus_code": campus, "request_type": "approve_team",
+                    "competition_id": str(uuid.uuid4())}
+        elif member_roll < 0.8:
+            routing_key = ROUTING_KEY_MEMBER_ADD
+            body = {"team_id": team_id, "campus_code": campus, "request_type": "add_team_member",
+                    "user_id": str(rng.randint(20200000, 20249999))}
+        else:
+            routing_key = ROUTING_KEY_MEMBER_DELETION
+            body = {"team_id": team_id, "campus_code": campus, "request_type": "remove_team_member",
+                    "user_id": str(rng.randint(20200000, 20249999))}
+
+        sent.append((routing_key, body))
+        stream.append((routing_key, body, "new_without_id" if rng.random() < without_id_ratio else "new"))
+
+    return stream
+
+
+def load_fixture(path: str) -> list[tuple[str, dict, str]]:
+    stream = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                entry = json.loads(line)
+                stream.append((entry["routing_key"], entry["body"], entry.get("kind", "recorded")))
+    return stream
+
+
+async def run(args) -> None:
+    from benchmarks.common import InMemoryBroker, QueryCounter, reset_schema
+
+    broker = InMemoryBroker()
+    broker.install()
+
+    from sqlalchemy import insert
+
+    from sqlalchemy import func, select
+
+    from messaging import consumers
+    from messaging.processed_messages import message_key
+    from requests.models.processed_message import ProcessedMessage
+    from requests.models.request import Request, RequestStatusEnum, RequestTypeEnum
+    from shared.database import AsyncSessionLocal, engine
+
+    rng = random.Random(args.seed)
+    campuses = campus_codes(args.campuses)
+
+    await reset_schema()
+
+    # Aprovações prévias usadas pelas mensagens de delete_team
+    approved_teams = {campus: [uuid.uuid4() for _ in range(args.approved_teams_per_campus)] for campus in campuses}
+    decided_at = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        rows = [
+            {"id": uuid.uuid4(), "request_type": RequestTypeEnum.approve_team, "team_id": team_id,
+             "competition_id": uuid.uuid4(), "campus_code": campus, "status": RequestStatusEnum.approved,
+             "decided_at": decided_at}
+            for campus, team_ids in approved_teams.items() for team_id in team_ids
+        ]
+        if rows:
+            await db.execute(insert(Request), rows)
+
+        # Remoções de membro já rejeitadas cujas mensagens, sem message_id, estão em processed_messages: o
+        # produtor reenvia a mesma mensagem e ela deve gerar uma nova solicitação
+        decided_messages = []
+        for campus in campuses:
+            for _ in range(args.decided_requests_per_campus):
+                body = {"team_id": str(uuid.uuid4()), "campus_code": campus, "request_type": "remove_team_member",
+                        "user_id": str(rng.randint(20200000, 20249999))}
+                decided_messages.append((ROUTING_KEY_MEMBER_DELETION, body))
+        if decided_messages:
+            await db.execute(insert(Request), [
+                {"id": uuid.uuid4(), "request_type": RequestTypeEnum.remove_team_member,
+                 "team_id": uuid.UUID(body["team_id"]), "user_id": body["user_id"], "campus_code": body["campus_code"],
+                 "status": RequestStatusEnum.rejected, "reason_rejected": "Membro necessário na equipe",
+                 "decided_at": decided_at}
+                for _, body in decided_messages
+            ])
+            await db.execute(insert(ProcessedMessage), [
+                {"message_key": message_key(ReplayMessage(routing_key, json.dumps(body).encode(), "seed", None,
+                                                          with_message_id=False))}
+                for routing_key, body in decided_messages
+            ])
+        await db.commit()
+
+    if args.fixture:
+        stream = load_fixture(args.fixture)
+    else:
+        stream = synthetic_stream(args.messages, campuses, approved_teams, args.duplicate_ratio,
+                                  args.delete_ratio, rng, args.redelivery_ratio, args.without_id_ratio,
+                                  decided_messages, args.resubmission_ratio)
+
+    if args.write_fixture:
+        with open(args.write_fixture, "w") as file:
+            for routing_key, body, kind in stream:
+                file.write(json.dumps({"routing_key": routing_key, "body": body, "kind": kind}) + "\n")
+
+    # Como no broker, o prefetch vale por fila (cada fila tem seu próprio canal)
+    prefetch = {settings.queue: args.prefetch or settings.prefetch for settings in consumers.QUEUE_SETTINGS}
+    in_flight = {queue: asyncio.Semaphore(count) for queue, count in prefetch.items()}
+    latencies: dict[str, list[float]] = {}
+    outcomes: dict[str, int] = {}
+    settled = asyncio.Event()
+    remaining = len(stream)
+
+    def on_settle(message: ReplayMessage, latency: float) -> None:
+        nonlocal remaining
+        latencies.setdefault(message.kind, []).append(latency)
+        outcomes[message.outcome] = outcomes.get(message.outcome, 0) + 1
+        in_flight[broker.bindings[message.routing_key]].release()
+        remaining -= 1
+        if remaining == 0:
+            settled.set()
+
+    consumer_task = asyncio.create_task(consumers.main_consumer())
+    while len(broker.consumers) < len(consumers.QUEUES_BY_ROUTING_KEY):
+        await asyncio.sleep(0.01)
+
+    query_counter = QueryCounter()
+    delivery_tasks = set()
+
+    def _discard_delivery(task: asyncio.Task) -> None:
+        # Mensagens rejeitadas propagam o erro pelo callback, como no aio-pika; aqui ele só é descartado
+        delivery_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    stream_by_queue: dict[str, list] = {}
+    for routing_key, body, kind in stream:
+        stream_by_queue.setdefault(broker.bindings[routing_key], []).append((routing_key, body, kind))
+
+    # Reentregas repetem o message_id da primeira entrega (ou a falta dele); duplicadas do produtor recebem um novo
+    message_ids: dict[tuple[str, bytes], str | None] = {}
+
+    async def deliver(queue: str, queue_stream: list) -> None:
+        callback = broker.consumers[queue]
+        for routing_key, body, kind in queue_stream:
+            await in_flight[queue].acquire()
+            message = ReplayMessage(routing_key, json.dumps(body).encode(), kind, on_settle,
+                                    with_message_id=kind not in WITHOUT_MESSAGE_ID_KINDS)
+            identity = (routing_key, message.body)
+            if kind == "redelivered":
+                message.message_id = message_ids.get(identity, message.message_id)
+                message.redelivered = True
+            else:
+                message_ids.setdefault(identity, message.message_id)
+            message.delivered_at = time.perf_counter()
+
+            # Como no aio-pika, cada entrega roda em sua própria tarefa
+            task = asyncio.create_task(callback(message))
+            delivery_tasks.add(task)
+            task.add_done_callback(_discard_delivery)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(deliver(queue, queue_stream) for queue, queue_stream in stream_by_queue.items()))
+    if stream:
+        await settled.wait()
+    elapsed = time.perf_counter() - start
+    round_trips = query_counter.count
+
+    # Cada solicitação decidida reenviada deve ter gerado exatamente uma nova solicitação pendente
+    resubmitted_teams = {uuid.UUID(body["team_id"]) for _, body, kind in stream if kind == "resubmitted_without_id"}
+    async with AsyncSessionLocal() as db:
+        resubmissions_created = await db.scalar(
+            select(func.count()).select_from(Request)
+            .where(Request.team_id.in_(resubmitted_teams), Request.status == RequestStatusEnum.pendent)
+        ) if resubmitted_teams else 0
+
+    consumer_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await consumer_task
+    await engine.dispose()
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    results = {
+        "overall": {
+            **summarize_latencies(all_latencies, 0, elapsed),
+            "db_round_trips_per_message": round(round_trips / len(stream), 3) if stream else 0.0,
+            **{f"{outcome}_messages": count for outcome, count in sorted(outcomes.items())},
+        },
+        **{kind: summarize_latencies(values, 0, elapsed) for kind, values in sorted(latencies.items())},
+        "resubmissions": {"expected": len(resubmitted_teams), "created": resubmissions_created},
+    }
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "write_fixture")}
+    config["prefetch"] = prefetch
+    config["consumer_batch_size"] = consumers.CONSUMER_BATCH_SIZE
+    config["consumer_db_concurrency"] = consumers.CONSUMER_DB_CONCURRENCY
+    config["concurrency"] = {settings.queue: settings.concurrency for settings in consumers.QUEUE_SETTINGS}
+    config["messages"] = len(stream)
+    write_results(args.output, "consumer_replay", config, results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./benchmark_consumer.db",
+                        help="Banco usado no benchmark. As tabelas são recriadas!")
+    parser.add_argument("--messages", type=int, default=5000, help="Mensagens do fluxo sintético")
+    parser.add_argument("--fixture", default=None, help="Arquivo JSONL com as mensagens a reproduzir")
+    parser.add_argument("--write-fixture", default=None, help="Grava o fluxo usado em um arquivo JSONL")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1,
+                        help="Fração de mensagens repetindo uma solicitação já enviada")
+    parser.add_argument("--redelivery-ratio", type=float, default=0.05,
+                        help="Fração de mensagens reentregues pelo broker (mesmo message_id de uma já enviada)")
+    parser.add_argument("--without-id-ratio", type=float, default=0.1,
+                        help="Fração das solicitações novas publicadas sem message_id")
+    parser.add_argument("--resubmission-ratio", type=float, default=0.02,
+                        help="Fração de mensagens sem message_id reenviando uma solicitação já decidida")
+    parser.add_argument("--decided-requests-per-campus", type=int, default=20,
+                        help="Solicitações já decididas, por campus, disponíveis para reenvio")
+    parser.add_argument("--delete-ratio", type=float, default=0.1, help="Fração de mensagens de delete_team")
+    parser.add_argument("--campuses", type=int, default=12)
+    parser.add_argument("--approved-teams-per-campus", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Valor de CONSUMER_BATCH_SIZE (padrão: o do ambiente)")
+    parser.add_argument("--prefetch", type=int, default=None,
+                        help="Mensagens sem ack permitidas por fila (padrão: o prefetch configurado de cada fila)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Valor de CONSUMER_CONCURRENCY (padrão: o do ambiente)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Arquivo JSON com o resultado")
+    args = parser.parse_args()
+    if args.batch_size is not None and args.batch_size > 1 and args.concurrency is not None:
+        parser.error("--concurrency não se aplica ao modo em lote (--batch-size > 1)")
+
+    configure_environment(args.database_url)
+    if args.batch_size is not None:
+        os.environ["CONSUMER_BATCH_SIZE"] = str(args.batch_size)
+    if args.concurrency is not None:
+        os.environ["CONSUMER_CONCURRENCY"] = str(args.concurrency)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmark de carga HTTP para a listagem, o detalhe e o PUT de `/api/v1/requests`.
+
+Uso:
+    python -m benchmarks.http_load --requests 2000 --concurrency 32 --output baseline.json
+    python -m benchmarks.compare baseline.json atual.json
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import (configure_environment, campus_codes, campus_weights, sign_token, summarize_latencies,
+                               write_results)
+
+API_PREFIX = "/api/v1/requests"
+
+
+async def _run_scenario(client, concurrency: int, total: int, make_request, on_response=None) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, headers, body = make_request()
+            if url is None:
+                return
+
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, json=body)
+                ok = response.status_code < 400
+                if ok and on_response:
+                    on_response(url, response)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize_latencies(latencies, errors, time.perf_counter() - start)
+
+
+async def run(args) -> None:
+    from benchmarks.common import InMemoryBroker, reset_schema, seed_requests
+
+    broker = InMemoryBroker(confirm_latency=args.confirm_latency_ms / 1000)
+    broker.install()
+
+    import httpx
+    from shared.database import engine
+
+    rng = random.Random(args.seed)
+    campuses = campus_codes(args.campuses)
+    weights = campus_weights(len(campuses))
+    headers_by_campus = {campus: {"Authorization": f"Bearer {sign_token(campus)}"} for campus in campuses}
+
+    await reset_schema()
+    seeded = (await seed_requests(args.seed_requests, campuses, args.teams_per_campus, rng))["requests"]
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        from main import app
+        from messaging.audit_publisher import audit_pipeline
+        from messaging.outbox import outbox_relay
+
+        # O ASGITransport não executa o lifespan; as tarefas de fundo do PUT são iniciadas aqui
+        outbox_relay.start()
+        audit_pipeline.start()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=30)
+
+    def pick_campus() -> str:
+        campus = rng.choices(campuses, weights)[0]
+        while not seeded[campus]["ids"]:
+            campus = rng.choices(campuses, weights)[0]
+        return campus
+
+    def list_request():
+        campus = pick_campus()
+        params = {"limit": args.page_size}
+        filter_kind = rng.random()
+        if filter_kind < 0.3:
+            params["status"] = rng.choice(["pendent", "approved", "rejected"])
+        elif filter_kind < 0.5:
+            params["request_type"] = rng.choice(["approve_team", "add_team_member"])
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return "GET", f"{API_PREFIX}/?{query}", headers_by_campus[campus], None
+
+    def detail_request():
+        campus = pick_campus()
+        request_id = rng.choice(seeded[campus]["ids"])
+        return "GET", f"{API_PREFIX}/{request_id}", headers_by_campus[campus], None
+
+    # Painéis que consultam sempre a primeira página, revalidando com o ETag da resposta anterior
+    etags: dict[str, str] = {}
+    campus_by_token = {headers["Authorization"]: campus for campus, headers in headers_by_campus.items()}
+    poll_counts = {"not_modified": 0}
+
+    def poll_request():
+        campus = pick_campus()
+        headers = dict(headers_by_campus[campus])
+        if campus in etags:
+            headers["If-None-Match"] = etags[campus]
+        return "GET", f"{API_PREFIX}/?limit={args.page_size}", headers, None
+
+    def poll_response(url, response):
+        if response.status_code == 304:
+            poll_counts["not_modified"] += 1
+        if "etag" in response.headers:
+            etags[campus_by_token[response.request.headers["Authorization"]]] = response.headers["etag"]
+
+    pending = [(campus, request_id) for campus in campuses for request_id in seeded[campus]["pending"]]
+    rng.shuffle(pending)
+
+    def put_request():
+        if not pending:
+            return "PUT", None, None, None
+        campus, request_id = pending.pop()
+        if rng.random() < 0.8:
+            body = {"status": "approved"}
+        else:
+            body = {"status": "rejected", "reason_rejected": "Documentação incompleta"}
+        return "PUT", f"{API_PREFIX}/{request_id}", headers_by_campus[campus], body
+
+    scenarios = {"list": list_request, "detail": detail_request, "poll": poll_request, "put": put_request}
+    callbacks = {"poll": poll_response}
+    selected = args.scenarios.split(",")
+
+    results = {}
+    async with client:
+        for name in selected:
+            # Aquecimento: preenche caches e o pool de conexões antes da medição
+            if name != "put":
+                await _run_scenario(client, args.concurrency, args.warmup, scenarios[name], callbacks.get(name))
+            if name == "poll":
+                poll_counts["not_modified"] = 0
+            results[name] = await _run_scenario(client, args.concurrency, args.requests, scenarios[name],
+                                                callbacks.get(name))
+            if name == "poll":
+                results[name]["not_modified"] = poll_counts["not_modified"]
+
+    if not args.base_url:
+        await outbox_relay.stop()
+        await audit_pipeline.stop()
+        results["broker_published"] = broker.published
+
+    await engine.dispose()
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "http_load", config, results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./benchmark_http.db",
+                        help="Banco usado no benchmark. As tabelas são recriadas!")
+    parser.add_argument("--base-url", default=None,
+                        help="Mede um servidor já em execução (com o mesmo banco e JWT_SECRET_KEY=benchmark-secret) "
+                             "em vez da aplicação em processo")
+    parser.add_argument("--scenarios", default="list,detail,poll,put")
+    parser.add_argument("--requests", type=int, default=1000, help="Requisições medidas por cenário")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed-requests", type=int, default=20000)
+    parser.add_argument("--campuses", type=int, default=12)
+    parser.add_argument("--teams-per-campus", type=int, default=300)
+    parser.add_argument("--confirm-latency-ms", type=float, default=1.0,
+                        help="Latência simulada da confirmação do RabbitMQ")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compara json e orjson na serialização dos payloads AMQP e das respostas da API.
+
+Uso:
+    python -m benchmarks.serialization --output serializacao.json
+"""
+import argparse
+import random
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import configure_environment, write_results
+
+
+def _time_per_op(function, repeat: int, number: int) -> float:
+    # Melhor de `repeat` rodadas, em microssegundos por operação
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number * 1_000_000
+
+
+def _compare(results: dict, name: str, functions: dict, repeat: int, number: int) -> None:
+    timings = {codec: _time_per_op(function, repeat, number) for codec, function in functions.items()}
+    results[name] = {f"{codec}_us": round(timing, 3) for codec, timing in timings.items()}
+    if "json" in timings and "orjson" in timings:
+        results[name]["speedup"] = round(timings["json"] / timings["orjson"], 2)
+
+
+def build_page(size: int, rng: random.Random) -> dict:
+    from requests.models.request import RequestsPageResponse
+
+    now = datetime.now(timezone.utc)
+    items = [{
+        "id": uuid.uuid4(),
+        "request_type": rng.choice(["approve_team", "add_team_member", "remove_team_member", "delete_team"]),
+        "team_id": uuid.uuid4(),
+        "competition_id": uuid.uuid4(),
+        "user_id": str(rng.randint(20200000, 20249999)),
+        "campus_code": "CAMPUS01",
+        "reason": None,
+        "reason_rejected": None,
+        "status": rng.choice(["pendent", "approved", "rejected"]),
+        "created_at": now - timedelta(minutes=index),
+    } for index in range(size)]
+
+    return RequestsPageResponse(items=items, next_cursor="bmV4dA").model_dump(mode="json")
+
+
+def run(args) -> None:
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    from messaging.audit_publisher import generate_log_payload
+    from messaging.codec import JsonCodec, OrjsonCodec
+
+    rng = random.Random(args.seed)
+    codecs = {"json": JsonCodec, "orjson": OrjsonCodec}
+
+    consumer_message = {
+        "team_id": str(uuid.uuid4()), "campus_code": "CAMPUS01", "request_type": "add_team_member",
+        "user_id": "20231234", "reason": "Entrada na equipe", "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    update_event = {
+        "team_id": str(uuid.uuid4()), "campus_code": "CAMPUS01", "status": "approved",
+        "competition_id": str(uuid.uuid4()), "request_type": "approve_team",
+    }
+    audit_body = (
+        [generate_log_payload(event_type="request.approved", service_origin="requests_service",
+                              entity_type="request", entity_id=str(uuid.uuid4()),
+                              operation_type="UPDATE", campus_code="CAMPUS01", user_registration="20231234",
+                              request_object=None, old_data=update_event, new_data=update_event)],
+        {},
+        {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+    )
+
+    results = {}
+    number = args.number
+    for name, payload in {"consumer_message": consumer_message, "update_event": update_event,
+                          "audit_message": audit_body}.items():
+        encoded = JsonCodec.dumps(payload)
+        _compare(results, f"{name}_dumps",
+                 {codec_name: (lambda c=codec: c.dumps(payload)) for codec_name, codec in codecs.items()},
+                 args.repeat, number)
+        _compare(results, f"{name}_loads",
+                 {codec_name: (lambda c=codec: c.loads(encoded)) for codec_name, codec in codecs.items()},
+                 args.repeat, number)
+
+    for size in args.page_sizes:
+        page = build_page(size, rng)
+        _compare(results, f"list_response_{size}_items", {
+            "json": lambda: JSONResponse(page),
+            "orjson": lambda: ORJSONResponse(page),
+        }, args.repeat, max(1, number // size))
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "serialization", config, results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Operações por rodada")
+    parser.add_argument("--repeat", type=int, default=5, help="Rodadas; vale a mais rápida")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    configure_environment("sqlite:///:memory:")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
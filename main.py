@@ -1,46 +1,121 @@
 import uvicorn
 import asyncio
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Response
 from contextlib import asynccontextmanager
 
 from requests.routers import requests_router
 from shared.exceptions_handler import not_found_exception_handler, conflict_exception_handler
 from shared.exceptions import NotFound, Conflict
-from messaging.consumers import main_consumer
+from messaging.consumers import main_consumer, check_batch_settings, CONSUMER_DRAIN_TIMEOUT
+from messaging.request_event_publisher import event_publisher
+from messaging.audit_publisher import audit_pipeline
+from messaging.outbox import outbox_relay
+from messaging.processed_messages import processed_messages
+from messaging.request_event_broadcast import request_event_broadcaster
+from auth import token_cache
+from services.request_cache import request_cache
+from services.request_events import request_event_hub
+from services.request_archive import request_archiver, REQUESTS_ARCHIVE_ENABLED
+from shared.logger import get_logger, logging_metrics
+from shared.metrics import MetricsMiddleware, render_metrics
 
+logger = get_logger("lifespan")
+
+# Com "false", as filas são consumidas apenas pelos processos de `python -m messaging.worker`
+RUN_CONSUMER_IN_API = os.getenv("RUN_CONSUMER_IN_API", "true").lower() in ("1", "true", "yes")
 
 consumer_task = None
+consumer_stop_event = None
 
 
 @asynccontextmanager
 async def lifespan_manager(app: FastAPI):
-    global consumer_task
-    print("INFO:     [requests_service] Lifespan: Iniciando consumidor RabbitMQ...")
+    global consumer_task, consumer_stop_event
+    logger.info("Conectando publicador de eventos RabbitMQ...")
     try:
-        consumer_task = asyncio.create_task(main_consumer())
-        print("INFO:     [requests_service] Lifespan: Tarefa do consumidor RabbitMQ criada e agendada.")
+        await event_publisher.connect()
+        logger.info("Publicador de eventos conectado.")
     except Exception as e:
-        print(f"ERRO CRÍTICO: [requests_service] Lifespan: Falha ao iniciar a tarefa do consumidor: {e}")
+        # O publicador tenta conectar novamente na primeira publicação
+        logger.warning("Falha ao conectar o publicador de eventos: %s", e)
+
+    outbox_relay.start()
+    logger.info("Relay da outbox de eventos iniciado.")
+
+    request_event_broadcaster.start()
+    logger.info("Repasse de eventos do stream entre processos iniciado.")
+
+    audit_pipeline.start()
+    logger.info("Pipeline de auditoria iniciado.")
+
+    if REQUESTS_ARCHIVE_ENABLED:
+        request_archiver.start()
+        logger.info("Arquivador de solicitações decididas iniciado.")
+
+    if RUN_CONSUMER_IN_API:
+        logger.info("Iniciando consumidor RabbitMQ...")
+        # Fora do try: configuração inválida deve impedir a subida, não sumir dentro da tarefa
+        check_batch_settings()
+        try:
+            consumer_stop_event = asyncio.Event()
+            consumer_task = asyncio.create_task(main_consumer(consumer_stop_event))
+            logger.info("Tarefa do consumidor RabbitMQ criada e agendada.")
+        except Exception as e:
+            logger.critical("Falha ao iniciar a tarefa do consumidor: %s", e)
+    else:
+        logger.info("Consumidor desativado nesta instância (RUN_CONSUMER_IN_API=false).")
 
     yield
 
-    print("INFO:     [requests_service] Lifespan: Finalizando. Solicitando cancelamento da tarefa do consumidor...")
+    logger.info("Finalizando. Solicitando o encerramento da tarefa do consumidor...")
     if consumer_task and not consumer_task.done():
-        consumer_task.cancel()
+        consumer_stop_event.set()
         try:
-            await consumer_task
+            await asyncio.wait_for(consumer_task, timeout=CONSUMER_DRAIN_TIMEOUT + 5)
+            logger.info("Tarefa do consumidor RabbitMQ encerrada com sucesso.")
+        except asyncio.TimeoutError:
+            logger.warning("Consumidor não encerrou a tempo; tarefa cancelada.")
         except asyncio.CancelledError:
-            print("INFO:     [requests_service] Lifespan: Tarefa do consumidor RabbitMQ cancelada com sucesso.")
+            logger.info("Tarefa do consumidor RabbitMQ cancelada com sucesso.")
         except Exception as e:
-            print(f"ERRO: [requests_service] Lifespan: Erro durante o cancelamento da tarefa do consumidor: {e}")
+            logger.error("Erro durante o encerramento da tarefa do consumidor: %s", e)
     else:
-        print(
-            "INFO:     [requests_service] Lifespan: Tarefa do consumidor não estava ativa ou já havia sido concluída.")
-    print("INFO:     [requests_service] Lifespan: Processo de shutdown concluído.")
+        logger.info("Tarefa do consumidor não estava ativa ou já havia sido concluída.")
+
+    try:
+        await outbox_relay.stop()
+        logger.info("Relay da outbox encerrado.")
+    except Exception as e:
+        logger.error("Erro ao encerrar o relay da outbox: %s", e)
+
+    try:
+        await request_event_broadcaster.stop()
+    except Exception as e:
+        logger.error("Erro ao encerrar o repasse de eventos do stream: %s", e)
+
+    try:
+        await request_archiver.stop()
+    except Exception as e:
+        logger.error("Erro ao encerrar o arquivador de solicitações: %s", e)
+
+    try:
+        await audit_pipeline.stop()
+        logger.info("Pipeline de auditoria esvaziado e encerrado.")
+    except Exception as e:
+        logger.error("Erro ao encerrar o pipeline de auditoria: %s", e)
+
+    try:
+        await event_publisher.close()
+        logger.info("Publicador de eventos fechado.")
+    except Exception as e:
+        logger.error("Erro ao fechar o publicador de eventos: %s", e)
+    logger.info("Processo de shutdown concluído.")
 
 
 app = FastAPI(lifespan=lifespan_manager)
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(requests_router.router)
 app.add_exception_handler(NotFound, not_found_exception_handler)
 app.add_exception_handler(Conflict, conflict_exception_handler)
@@ -49,7 +124,9 @@ app.add_exception_handler(Conflict, conflict_exception_handler)
 @app.get("/health")
 async def health_check():
     task_status = "não iniciada ou já concluída"
-    if consumer_task:
+    if not RUN_CONSUMER_IN_API:
+        task_status = "desativada (RUN_CONSUMER_IN_API=false)"
+    elif consumer_task:
         if consumer_task.done():
             if consumer_task.cancelled():
                 task_status = "cancelada"
@@ -63,9 +140,24 @@ async def health_check():
     return {
         "service": "requests_service",
         "status": "healthy_api",
-        "consumer_task_status": task_status
+        "consumer_task_status": task_status,
+        "audit_pipeline": audit_pipeline.metrics(),
+        "outbox_relay": outbox_relay.metrics(),
+        "auth_token_cache": token_cache.stats(),
+        "request_cache": request_cache.stats(),
+        "request_events": request_event_hub.metrics(),
+        "request_events_broadcast": request_event_broadcaster.metrics(),
+        "request_archive": request_archiver.metrics(),
+        "processed_messages": processed_messages.metrics(),
+        "logging": logging_metrics(),
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001, proxy_headers=True)
\ No newline at end of file
@@ -1,10 +1,16 @@
 import asyncio
 import aio_pika
-import json
 import os
+import time
 import uuid
 from datetime import datetime, timezone
 
+from messaging.codec import codec
+from shared.logger import get_logger
+from shared.metrics import PUBLISH_DURATION, AUDIT_QUEUE_DEPTH, AUDIT_DROPPED
+
+logger = get_logger("audit")
+
 RABBITMQ_USER_DEFAULT = "guest"
 RABBITMQ_PASSWORD_DEFAULT = "guest"
 RABBITMQ_HOST_DEFAULT = "rabbitmq"
@@ -28,9 +34,9 @@ if not RABBITMQ_URL:
         vhost_path = vhost
 
     RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
+    logger.info("RABBITMQ_URL não estava definida no ambiente. URL montada: %s", RABBITMQ_URL)
 else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+    logger.info("Usando RABBITMQ_URL definida no ambiente: %s", RABBITMQ_URL)
 
 def generate_log_payload(
     event_type: str,
@@ -75,68 +81,232 @@ def generate_log_payload(
         "ip_address": ip
     }
 
-# --- Função de Publicação com Routing Key Dinâmica ---
+# --- Pipeline de Publicação com Routing Key Dinâmica ---
 
 AUDIT_EXCHANGE = "events_exchange"
 
-async def publish_audit_log(log_payload: dict):
+AUDIT_QUEUE_MAX_SIZE = int(os.getenv("AUDIT_QUEUE_MAX_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_SHUTDOWN_TIMEOUT = float(os.getenv("AUDIT_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+# Mesmo limite do publicador de eventos de solicitações
+PUBLISHER_CONFIRM_TIMEOUT = float(os.getenv("RABBITMQ_PUBLISHER_CONFIRM_TIMEOUT", "10"))
+AUDIT_RETRY_DELAY = 5
+
+
+def build_audit_message(log_payload: dict) -> aio_pika.Message:
     """
-    Publica uma mensagem de log de auditoria no RabbitMQ com uma routing key específica.
+    Monta a mensagem de auditoria no formato esperado pelo worker Celery do serviço de auditoria.
 
     :param log_payload: Dados de log a serem publicados.
     """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+    # 1. Montar o corpo no formato Celery: (args, kwargs, options)
+    celery_body = (
+        [log_payload],  # args: seu payload vai aqui
+        {},             # kwargs: vazio neste caso
+        {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+    )
+
+    # 2. Definir os cabeçalhos (headers) essenciais do Celery
+    task_id = str(uuid.uuid4())
+    celery_headers = {
+        'lang': 'py',
+        'task': 'process_audit_log', # O nome exato da sua tarefa
+        'id': task_id,
+        'root_id': task_id,
+        'parent_id': None,
+        'group': None,
+    }
+
+    # 3. Criar a mensagem aio_pika com todas as propriedades
+    return aio_pika.Message(
+        body=codec.dumps(celery_body),
+        headers=celery_headers,
+        content_type='application/json',  # Celery usa JSON por padrão
+        content_encoding='utf-8',
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+    )
+
+
+class AuditPipeline:
+    """
+    Fila de auditoria em memória, limitada, drenada por uma única tarefa de envio.
+
+    Os logs são enfileirados sem bloquear a rota. A tarefa de envio agrupa tudo o que estiver
+    na fila (até `batch_size`) e publica o lote em um único canal com publisher confirms.
+    Quando a fila está cheia, o log novo é descartado e contabilizado em `overflow`.
+    """
+
+    def __init__(self, url: str, exchange_name: str,
+                 max_size: int = AUDIT_QUEUE_MAX_SIZE, batch_size: int = AUDIT_BATCH_SIZE):
+        self.url = url
+        self.exchange_name = exchange_name
+        self.max_size = max_size
+        self.batch_size = batch_size
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._accepting = False
+        self._stopped = False
+
+        self._connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self._channel: aio_pika.abc.AbstractChannel | None = None
+        self._exchange: aio_pika.abc.AbstractExchange | None = None
+
+        self.enqueued = 0
+        self.published = 0
+        self.overflow = 0
+        self.dropped = 0
+        self.batches = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+
+        # A fila é criada aqui para ficar associada ao event loop em execução
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+        self._accepting = True
+        self._stopped = False
 
-        async with connection:
-            channel = await connection.channel()
+    def submit(self, log_payload: dict) -> bool:
+        """
+        Enfileira um log de auditoria. Retorna False se o log foi descartado.
 
-            exchange = await channel.declare_exchange(
-                AUDIT_EXCHANGE,
+        O início implícito vale só enquanto o pipeline nunca foi parado: depois de `stop()`, os logs
+        que ainda chegarem (por exemplo, de tarefas terminando no encerramento) são descartados.
+        """
+        if not self.is_running and not self._stopped:
+            self.start()
+
+        if not self._accepting:
+            self._drop(1)
+            return False
+
+        try:
+            self._queue.put_nowait(log_payload)
+        except asyncio.QueueFull:
+            self.overflow += 1
+            self._drop(1)
+            return False
+
+        self.enqueued += 1
+        return True
+
+    async def stop(self, timeout: float = AUDIT_SHUTDOWN_TIMEOUT) -> None:
+        """
+        Para de aceitar logs, aguarda o envio do que já está na fila e fecha a conexão.
+        """
+        self._stopped = True
+        self._accepting = False
+        if self._task is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pending = self._queue.qsize()
+            self._drop(pending)
+            logger.warning("%d logs de auditoria descartados no encerramento.", pending)
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._connection is not None and not self._connection.is_closed:
+            await self._connection.close()
+        self._connection = None
+        self._channel = None
+        self._exchange = None
+
+    def _drop(self, count: int) -> None:
+        self.dropped += count
+        AUDIT_DROPPED.inc(count)
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "published": self.published,
+            "batches": self.batches,
+            "overflow": self.overflow,
+            "dropped": self.dropped,
+        }
+
+    async def _get_exchange(self) -> aio_pika.abc.AbstractExchange:
+        if self._connection is None or self._connection.is_closed:
+            self._connection = await aio_pika.connect_robust(self.url)
+            self._channel = None
+
+        if self._channel is None or self._channel.is_closed:
+            self._channel = await self._connection.channel(publisher_confirms=True)
+            self._exchange = await self._channel.declare_exchange(
+                self.exchange_name,
                 aio_pika.ExchangeType.TOPIC,
                 durable=True
             )
 
-             # 1. Montar o corpo no formato Celery: (args, kwargs, options)
-            celery_body = (
-                [log_payload],  # args: seu payload vai aqui
-                {},             # kwargs: vazio neste caso
-                {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
-            )
+        return self._exchange
 
-            # 2. Definir os cabeçalhos (headers) essenciais do Celery
-            task_id = str(uuid.uuid4())
-            celery_headers = {
-                'lang': 'py',
-                'task': 'process_audit_log', # O nome exato da sua tarefa
-                'id': task_id,
-                'root_id': task_id,
-                'parent_id': None,
-                'group': None,
-            }
-
-            # 3. Criar a mensagem aio_pika com todas as propriedades
-            message = aio_pika.Message(
-                body=json.dumps(celery_body).encode('utf-8'),
-                headers=celery_headers,
-                content_type='application/json',  # Celery usa JSON por padrão
-                content_encoding='utf-8',
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
+    async def _publish_one(self, exchange: aio_pika.abc.AbstractExchange, log_payload: dict) -> None:
+        routing_key = f'{log_payload["event_type"]}'
+        start = time.perf_counter()
+        # Sem limite, uma confirmação perdida prenderia o lote e, com ele, toda a fila de auditoria
+        await exchange.publish(build_audit_message(log_payload), routing_key=routing_key,
+                               timeout=PUBLISHER_CONFIRM_TIMEOUT)
+        PUBLISH_DURATION.labels(routing_key=routing_key).observe(time.perf_counter() - start)
 
-            routing_key = f'{log_payload["event_type"]}'
+    async def _publish_batch(self, batch: list[dict]) -> None:
+        exchange = await self._get_exchange()
 
-            # A routing_key agora é o parâmetro recebido pela função
-            await exchange.publish(message, routing_key=routing_key)
+        # As publicações do lote compartilham o canal e aguardam as confirmações juntas
+        results = await asyncio.gather(
+            *(self._publish_one(exchange, log_payload) for log_payload in batch),
+            return_exceptions=True
+        )
 
-            print(f"[audit_service] Log enviado para exchange '{AUDIT_EXCHANGE}' com routing key '{routing_key}'")
-            print(f"[audit_service] Log payload: {log_payload}")
+        failures = [r for r in results if isinstance(r, BaseException)]
+        self.published += len(batch) - len(failures)
+        self._drop(len(failures))
+        self.batches += 1
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem de auditoria: {e}")
+        logger.debug("Lote de %d logs enviado para exchange '%s'", len(batch), AUDIT_EXCHANGE)
+        if failures:
+            logger.error("Erro ao publicar %d mensagens de auditoria: %s", len(failures), failures[0])
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                await self._publish_batch(batch)
+            except aio_pika.exceptions.AMQPConnectionError as e:
+                self._drop(len(batch))
+                logger.error("Erro de conexão com RabbitMQ: %s", e)
+                await asyncio.sleep(AUDIT_RETRY_DELAY)
+            except Exception as e:
+                self._drop(len(batch))
+                logger.error("Erro ao publicar mensagem de auditoria: %s", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+audit_pipeline = AuditPipeline(RABBITMQ_URL, AUDIT_EXCHANGE)
+
+AUDIT_QUEUE_DEPTH.set_function(lambda: audit_pipeline.metrics()["queue_depth"])
 
 def model_to_dict(model_instance):
     if not model_instance:
@@ -157,6 +327,6 @@ def convert_values(obj):
 
 def run_async_audit(log_payload: dict):
     try:
-        asyncio.ensure_future(publish_audit_log(log_payload))
+        audit_pipeline.submit(log_payload)
     except Exception as e:
-        print(f"CRITICAL: Falha ao publicar log de auditoria! Erro: {e}")
\ No newline at end of file
+        logger.critical("Falha ao publicar log de auditoria! Erro: %s", e)
\ No newline at end of file
@@ -0,0 +1,58 @@
+import json
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+# "orjson" (padrão, se instalado) ou "json" (biblioteca padrão)
+MESSAGING_JSON_CODEC = os.getenv("MESSAGING_JSON_CODEC", "orjson").lower()
+
+# orjson.JSONDecodeError é subclasse de json.JSONDecodeError, então um único except cobre os dois codecs
+DecodeError = json.JSONDecodeError
+
+
+class JsonCodec:
+    """
+    Codec JSON da biblioteca padrão.
+    """
+    name = "json"
+
+    @staticmethod
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data).encode("utf-8")
+
+    @staticmethod
+    def loads(body: bytes) -> Any:
+        return json.loads(body.decode("utf-8"))
+
+
+class OrjsonCodec:
+    """
+    Codec baseado no orjson: serializa direto para bytes e lê bytes sem decodificar antes.
+    """
+    name = "orjson"
+
+    @staticmethod
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    @staticmethod
+    def loads(body: bytes) -> Any:
+        return orjson.loads(body)
+
+
+CODECS = {JsonCodec.name: JsonCodec, OrjsonCodec.name: OrjsonCodec}
+
+
+def get_codec(name: str = MESSAGING_JSON_CODEC):
+    if name not in CODECS:
+        raise ValueError(f"Codec JSON desconhecido: {name}")
+    if name == OrjsonCodec.name and orjson is None:
+        return JsonCodec
+    return CODECS[name]
+
+
+codec = get_codec()
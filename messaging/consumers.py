@@ -1,9 +1,17 @@
 import asyncio
 import aio_pika
-import json
+import logging
 import os
+import time
 
-from services.crud import create_team_request_in_db_sync
+from messaging.codec import codec, DecodeError
+from messaging.processed_messages import processed_messages, message_key
+from services.crud import create_team_request_in_db, create_team_requests_in_db_batch
+from shared.database import DB_POOL_SIZE
+from shared.logger import get_logger, sample_payload
+from shared.metrics import CONSUMER_MESSAGES, CONSUMER_PROCESSING_DURATION
+
+logger = get_logger("consumer")
 
 RABBITMQ_USER_DEFAULT = "guest"
 RABBITMQ_PASSWORD_DEFAULT = "guest"
@@ -28,9 +36,9 @@ if not RABBITMQ_URL:
         vhost_path = vhost
 
     RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
+    logger.info("RABBITMQ_URL não estava definida no ambiente. URL montada: %s", RABBITMQ_URL)
 else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+    logger.info("Usando RABBITMQ_URL definida no ambiente: %s", RABBITMQ_URL)
 
 
 TEAMS_COMMANDS_EXCHANGE = "teams_commands_exchange"
@@ -47,132 +55,404 @@ ROUTING_KEY_MEMBER_DELETION = "member.removal.requested"
 REQUESTS_MEMBER_ADD_QUEUE = "requests_service.queue.member_add"
 ROUTING_KEY_MEMBER_ADD = "member.add.requested"
 
+QUEUES_BY_ROUTING_KEY = {
+    ROUTING_KEY_TEAM_CREATION: REQUESTS_TEAM_CREATION_QUEUE,
+    ROUTING_KEY_TEAM_DELETION: REQUESTS_TEAM_DELETION_QUEUE,
+    ROUTING_KEY_MEMBER_DELETION: REQUESTS_MEMBER_DELETION_QUEUE,
+    ROUTING_KEY_MEMBER_ADD: REQUESTS_MEMBER_ADD_QUEUE,
+}
 
-async def on_message(message: aio_pika.IncomingMessage) -> None:
-    async with message.process():
-        try:
-            data = json.loads(message.body.decode())
-            print(f" [requests_service] Received message: {data}")
-            print(f" [requests_service] Routing Key: {message.routing_key}")
+# Com CONSUMER_BATCH_SIZE > 1, as mensagens das quatro filas são agrupadas e gravadas em uma única transação
+CONSUMER_BATCH_SIZE = int(os.getenv("CONSUMER_BATCH_SIZE", "1"))
+CONSUMER_BATCH_MAX_WAIT_MS = int(os.getenv("CONSUMER_BATCH_MAX_WAIT_MS", "50"))
+CONSUMER_PREFETCH_COUNT = max(10, CONSUMER_BATCH_SIZE)
 
-            if hasattr(asyncio, 'to_thread'):
-                db_result = await asyncio.to_thread(create_team_request_in_db_sync, data)
-            else:
-                loop = asyncio.get_event_loop()
-                db_result = await loop.run_in_executor(None, create_team_request_in_db_sync, data)
+# Mensagens processadas ao mesmo tempo por fila, e no total (limitado ao pool do banco)
+CONSUMER_CONCURRENCY = int(os.getenv("CONSUMER_CONCURRENCY", "2"))
+CONSUMER_DB_CONCURRENCY = int(os.getenv("CONSUMER_DB_CONCURRENCY", str(DB_POOL_SIZE)))
 
-            print(f" [requests_service] Resultado do processamento do DB: {db_result}")
+# Transações do consumidor abertas ao mesmo tempo; nunca mais que as conexões do pool
+db_slots = asyncio.Semaphore(max(1, CONSUMER_DB_CONCURRENCY))
 
-        except json.JSONDecodeError as e:
-            print(f" [requests_service] Erro ao decodificar JSON: {e}. Mensagem será rejeitada.")
-            raise
-        except Exception as e:
-            print(f" [requests_service] Erro inesperado ao processar mensagem ou DB: {e}")
-            raise
+# Tempo máximo, no encerramento, para terminar as mensagens já entregues antes de fechar a conexão
+CONSUMER_DRAIN_TIMEOUT = float(os.getenv("CONSUMER_DRAIN_TIMEOUT_SECONDS", "30"))
 
+# Tarefas do aio-pika que estão processando uma mensagem neste momento
+in_flight_tasks: set[asyncio.Task] = set()
 
-async def main_consumer():
-    retry_delay = 10
-    while True:
-        connection = None
+
+class MessageBatcher:
+    """
+    Acumula mensagens até `max_size` itens ou `max_wait` segundos e as processa em lote.
+
+    O lote é validado e gravado com um único INSERT multi-linha; as mensagens só recebem ack
+    depois do commit. Se a transação do lote falhar, cada mensagem é reprocessada individualmente.
+    """
+
+    def __init__(self, max_size: int, max_wait: float):
+        self.max_size = max_size
+        self.max_wait = max_wait
+
+        self._pending: list[aio_pika.IncomingMessage] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 1
+
+    async def add(self, message: aio_pika.IncomingMessage) -> None:
+        self._pending.append(message)
+
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush_on_timer)
+
+    def _flush_on_timer(self) -> None:
+        self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._on_flush_done)
+
+    def _on_flush_done(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        # Ninguém aguarda a tarefa do temporizador; sem isto, a falha sumiria sem registro
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Falha ao gravar lote agendado: %s", task.exception())
+
+    async def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        # Lotes gravados em sequência para que a verificação de pendentes duplicadas enxergue o lote anterior
+        async with self._write_lock, db_slots:
+            await process_batch(batch)
+
+    async def drain(self) -> None:
+        await self.flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+
+message_batcher = MessageBatcher(CONSUMER_BATCH_SIZE, CONSUMER_BATCH_MAX_WAIT_MS / 1000)
+
+
+class QueueSettings:
+    """
+    Prefetch e concorrência de uma fila, lidos de `CONSUMER_<NOME>_PREFETCH` e `CONSUMER_<NOME>_CONCURRENCY`.
+
+    Cada fila tem seu próprio limite de mensagens em processamento, então uma rajada em uma fila
+    (por exemplo, criação de equipes) não ocupa todas as conexões do banco e não atrasa as demais.
+
+    No modo em lote a concorrência não se aplica: os lotes são gravados um por vez e o que limita cada
+    fila é o prefetch. Configurar as duas coisas é recusado em `check_batch_settings`.
+    """
+
+    def __init__(self, name: str, queue: str, routing_key: str):
+        self.name = name
+        self.queue = queue
+        self.routing_key = routing_key
+
+        self.concurrency = max(1, int(os.getenv(f"CONSUMER_{name}_CONCURRENCY", str(CONSUMER_CONCURRENCY))))
+        self.concurrency_configured = any(
+            os.getenv(variable) is not None for variable in (f"CONSUMER_{name}_CONCURRENCY", "CONSUMER_CONCURRENCY"))
+        self.prefetch = max(
+            self.concurrency, int(os.getenv(f"CONSUMER_{name}_PREFETCH", str(CONSUMER_PREFETCH_COUNT))))
+
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    async def on_message(self, message: aio_pika.IncomingMessage) -> None:
+        task = asyncio.current_task()
+        in_flight_tasks.add(task)
         try:
-            print(f"INFO: [requests_service] Consumidor: Tentando conectar ao RabbitMQ em {RABBITMQ_URL}...")
-            connection = await aio_pika.connect_robust(RABBITMQ_URL, timeout=15)
+            # Reentrega de uma mensagem já gravada: ack sem passar pelo banco. Só vale para mensagens marcadas
+            # pelo broker; sem `message_id`, um reenvio legítimo do produtor tem a mesma chave da anterior
+            if message.redelivered and processed_messages.seen(message_key(message)):
+                await skip_message(message)
+                return
+
+            # Sem `self._slots`: no modo em lote o limite por fila é o prefetch (ver `check_batch_settings`)
+            if message_batcher.enabled:
+                await message_batcher.add(message)
+                return
+
+            async with self._slots, db_slots:
+                await process_message(message)
+        finally:
+            in_flight_tasks.discard(task)
 
-            async with connection:
-                channel = await connection.channel()
-                await channel.set_qos(prefetch_count=10)
 
-                exchange = await channel.declare_exchange(
-                    TEAMS_COMMANDS_EXCHANGE,
-                    aio_pika.ExchangeType.DIRECT,
-                    durable=True
-                )
+async def drain_in_flight(timeout: float = CONSUMER_DRAIN_TIMEOUT) -> None:
+    """
+    Aguarda as mensagens já entregues (e o último lote) terminarem, para que recebam ack antes do fechamento.
+    """
+    try:
+        await asyncio.wait_for(_drain(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("%d mensagens ainda em processamento após %ss; serão devolvidas à fila pelo broker.",
+                       len(in_flight_tasks), timeout)
+
+
+async def _drain() -> None:
+    if in_flight_tasks:
+        await asyncio.gather(*in_flight_tasks, return_exceptions=True)
+    if message_batcher.enabled:
+        await message_batcher.drain()
+
+
+QUEUE_SETTINGS = [
+    QueueSettings("TEAM_CREATION", REQUESTS_TEAM_CREATION_QUEUE, ROUTING_KEY_TEAM_CREATION),
+    QueueSettings("TEAM_DELETION", REQUESTS_TEAM_DELETION_QUEUE, ROUTING_KEY_TEAM_DELETION),
+    QueueSettings("MEMBER_DELETION", REQUESTS_MEMBER_DELETION_QUEUE, ROUTING_KEY_MEMBER_DELETION),
+    QueueSettings("MEMBER_ADD", REQUESTS_MEMBER_ADD_QUEUE, ROUTING_KEY_MEMBER_ADD),
+]
 
 
-                # Fila para criar equipe
-                team_creation_queue = await channel.declare_queue(
-                    REQUESTS_TEAM_CREATION_QUEUE,
-                    durable=True
-                )
+def observe_message(message: aio_pika.IncomingMessage, outcome: str, start: float) -> None:
+    queue = QUEUES_BY_ROUTING_KEY.get(message.routing_key, message.routing_key)
+    CONSUMER_MESSAGES.labels(queue=queue, outcome=outcome).inc()
+    CONSUMER_PROCESSING_DURATION.labels(queue=queue).observe(time.perf_counter() - start)
 
-                await team_creation_queue.bind(exchange, routing_key=ROUTING_KEY_TEAM_CREATION)
 
-                print(f"INFO: [requests_service] Consumidor: Conectado! '{REQUESTS_TEAM_CREATION_QUEUE}' esperando por mensagens com routing key '{ROUTING_KEY_TEAM_CREATION}'. Para sair pressione CTRL+C")
+async def skip_message(message: aio_pika.IncomingMessage, start: float | None = None) -> None:
+    await message.ack()
+    processed_messages.skip()
+    observe_message(message, "skipped", start if start is not None else time.perf_counter())
+    logger.debug("Reentrega de mensagem já processada ignorada", extra={"routing_key": message.routing_key})
+
+
+async def process_batch(messages: list[aio_pika.IncomingMessage]) -> None:
+    start = time.perf_counter()
+    decoded_messages = []
+    decoded_data = []
+
+    for message in messages:
+        try:
+            decoded_data.append(codec.loads(message.body))
+            decoded_messages.append(message)
+        except DecodeError as e:
+            logger.warning("Erro ao decodificar JSON: %s. Mensagem será rejeitada.", e,
+                           extra={"routing_key": message.routing_key})
+            await message.reject(requeue=False)
+            observe_message(message, "rejected", start)
+
+    if not decoded_messages:
+        return
+
+    message_keys = [message_key(message) for message in decoded_messages]
+
+    # Só mensagens reentregues pelo broker podem já ter sido gravadas sem estar no LRU
+    try:
+        recorded = await processed_messages.recorded(
+            [key for message, key in zip(decoded_messages, message_keys) if message.redelivered])
+    except Exception as e:
+        # Sem a consulta, as reentregas seguem o caminho normal e caem na verificação de duplicidade
+        logger.warning("Falha ao consultar mensagens já processadas: %s", e)
+        recorded = set()
+    if recorded:
+        pending = []
+        for message, data, key in zip(decoded_messages, decoded_data, message_keys):
+            if message.redelivered and key in recorded:
+                await skip_message(message, start)
+            else:
+                pending.append((message, data, key))
+
+        if not pending:
+            return
+        decoded_messages, decoded_data, message_keys = (list(values) for values in zip(*pending))
+
+    try:
+        db_results = await create_team_requests_in_db_batch(decoded_data, message_keys)
+    except Exception as e:
+        logger.error("Erro ao gravar lote de %d mensagens: %s. Reprocessando individualmente.",
+                     len(decoded_messages), e)
+        for message in decoded_messages:
+            try:
+                await process_message(message)
+            except Exception as e:
+                logger.error("Erro ao reprocessar mensagem do lote: %s. Mensagem será rejeitada.", e,
+                             extra={"routing_key": message.routing_key})
+                # process() já rejeita quando o erro acontece dentro dele; aqui cobre as falhas antes disso
+                if not message.processed:
+                    await message.reject(requeue=False)
+        return
+
+    for message, key, db_result in zip(decoded_messages, message_keys, db_results):
+        if isinstance(db_result, Exception):
+            await message.reject(requeue=False)
+            observe_message(message, "rejected", start)
+        else:
+            processed_messages.mark([key])
+            await message.ack()
+            observe_message(message, "acked", start)
+
+    logger.debug("Lote de %d mensagens confirmado.", len(decoded_messages))
+
+
+async def process_message(message: aio_pika.IncomingMessage) -> None:
+    start = time.perf_counter()
+    outcome = "rejected"
+    try:
+        skipped = await _process_message(message)
+        outcome = "skipped" if skipped else "acked"
+    finally:
+        observe_message(message, outcome, start)
 
-                await team_creation_queue.consume(on_message)
 
+async def _process_message(message: aio_pika.IncomingMessage) -> bool:
+    """
+    Grava a mensagem e retorna True se ela foi ignorada por já ter sido processada.
+    """
+    key = message_key(message)
 
-                # Fila para deletar equipe
-                team_deletion_queue = await channel.declare_queue(
-                    REQUESTS_TEAM_DELETION_QUEUE,
-                    durable=True
-                )
+    async with message.process():
+        try:
+            if message.redelivered and await processed_messages.recorded([key]):
+                processed_messages.skip()
+                logger.debug("Reentrega de mensagem já processada ignorada",
+                             extra={"routing_key": message.routing_key})
+                return True
+
+            data = codec.loads(message.body)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Mensagem recebida", extra={
+                    "routing_key": message.routing_key, "payload": sample_payload(data)})
+
+            db_result = await create_team_request_in_db(data, key)
+            processed_messages.mark([key])
+
+            logger.debug("Mensagem processada", extra={
+                "routing_key": message.routing_key, "request_id": db_result["request_id"]})
+            return False
+
+        except DecodeError as e:
+            logger.warning("Erro ao decodificar JSON: %s. Mensagem será rejeitada.", e,
+                           extra={"routing_key": message.routing_key})
+            raise
+        except Exception as e:
+            logger.error("Erro inesperado ao processar mensagem ou DB: %s", e,
+                         extra={"routing_key": message.routing_key})
+            raise
 
-                await team_deletion_queue.bind(exchange, routing_key=ROUTING_KEY_TEAM_DELETION)
 
-                print(f"INFO: ... '{REQUESTS_TEAM_DELETION_QUEUE}' esperando por '{ROUTING_KEY_TEAM_DELETION}'...")
+def check_batch_settings() -> None:
+    """
+    Recusa a concorrência por fila junto com o modo em lote, em que ela seria ignorada sem aviso.
+    """
+    if not message_batcher.enabled:
+        return
 
-                await team_deletion_queue.consume(on_message)
+    configured = [settings.name for settings in QUEUE_SETTINGS if settings.concurrency_configured]
+    if configured:
+        raise ValueError(
+            f"CONSUMER_BATCH_SIZE={message_batcher.max_size} não pode ser usado com CONSUMER_CONCURRENCY ou "
+            f"CONSUMER_<FILA>_CONCURRENCY (definida para {', '.join(configured)}); no modo em lote, "
+            f"limite cada fila com CONSUMER_<FILA>_PREFETCH")
 
 
-                # Fila para deletar membro
-                member_deletion_queue = await channel.declare_queue(
-                    REQUESTS_MEMBER_DELETION_QUEUE,
-                    durable=True
-                )
+async def main_consumer(stop_event: asyncio.Event | None = None):
+    """
+    Consome as quatro filas, reconectando em caso de falha, até a tarefa ser cancelada ou `stop_event` ser sinalizado.
 
-                await member_deletion_queue.bind(exchange, routing_key=ROUTING_KEY_MEMBER_DELETION)
+    Com `stop_event`, o encerramento é gracioso: os consumidores são cancelados no broker, as mensagens
+    já entregues terminam de ser processadas e só então a conexão é fechada.
+    """
+    check_batch_settings()
+    processed_messages.start_pruning()
+    try:
+        await _consume(stop_event or asyncio.Event())
+    finally:
+        await processed_messages.stop_pruning()
 
-                print(f"INFO: ... '{REQUESTS_MEMBER_DELETION_QUEUE}' esperando por '{ROUTING_KEY_MEMBER_DELETION}'...")
 
-                await member_deletion_queue.consume(on_message)
+async def _consume(stop_event: asyncio.Event) -> None:
+    retry_delay = 10
+    while not stop_event.is_set():
+        connection = None
+        try:
+            logger.info("Tentando conectar ao RabbitMQ em %s...", RABBITMQ_URL)
+            connection = await aio_pika.connect_robust(RABBITMQ_URL, timeout=15)
 
+            try:
+                await processed_messages.warm()
+            except Exception as e:
+                logger.warning("Falha ao carregar as mensagens já processadas: %s", e)
 
-                # Fila para adicionar membro
-                member_add_queue = await channel.declare_queue(
-                    REQUESTS_MEMBER_ADD_QUEUE,
-                    durable=True
-                )
+            async with connection:
+                # Um canal por fila: o prefetch de cada fila é independente das demais
+                consumer_tags = []
+                for settings in QUEUE_SETTINGS:
+                    channel = await connection.channel()
+                    await channel.set_qos(prefetch_count=settings.prefetch)
 
-                await member_add_queue.bind(exchange, routing_key=ROUTING_KEY_MEMBER_ADD)
+                    exchange = await channel.declare_exchange(
+                        TEAMS_COMMANDS_EXCHANGE,
+                        aio_pika.ExchangeType.DIRECT,
+                        durable=True
+                    )
 
-                print(f"INFO: ... '{REQUESTS_MEMBER_ADD_QUEUE}' esperando por '{ROUTING_KEY_MEMBER_ADD}'...")
+                    queue = await channel.declare_queue(settings.queue, durable=True)
+                    await queue.bind(exchange, routing_key=settings.routing_key)
+                    consumer_tags.append((queue, await queue.consume(settings.on_message)))
 
-                await member_add_queue.consume(on_message)
+                    logger.info("'%s' esperando por '%s' (prefetch %d, concorrência %d)...",
+                                settings.queue, settings.routing_key, settings.prefetch, settings.concurrency)
 
+                await stop_event.wait()
 
-                await asyncio.Future()
+                logger.info("Encerrando: cancelando consumidores e aguardando mensagens em processamento...")
+                for queue, consumer_tag in consumer_tags:
+                    await queue.cancel(consumer_tag)
+                await drain_in_flight()
 
         except aio_pika.exceptions.AMQPConnectionError as e:
-            print(
-                f"AVISO: [requests_service] Consumidor: Falha na conexão com RabbitMQ (AMQPConnectionError): {e}. Tentando novamente em {retry_delay} segundos...")
+            logger.warning("Falha na conexão com RabbitMQ (AMQPConnectionError): %s. "
+                           "Tentando novamente em %d segundos...", e, retry_delay)
         except ConnectionRefusedError as e:
-            print(
-                f"AVISO: [requests_service] Consumidor: Conexão recusada (ConnectionRefusedError): {e}. Provavelmente o RabbitMQ não está totalmente pronto. Tentando novamente em {retry_delay} segundos...")
+            logger.warning("Conexão recusada (ConnectionRefusedError): %s. Provavelmente o RabbitMQ não está "
+                           "totalmente pronto. Tentando novamente em %d segundos...", e, retry_delay)
         except asyncio.CancelledError:
-            print("INFO: [requests_service] Consumidor: Tarefa cancelada. Encerrando consumidor.")
+            logger.info("Tarefa cancelada. Encerrando consumidor.")
             break
         except Exception as e:
-            print(
-                f"ERRO: [requests_service] Consumidor: Erro inesperado: {e}. Tentando novamente em {retry_delay} segundos...")
+            logger.exception("Erro inesperado: %s. Tentando novamente em %d segundos...", e, retry_delay)
         finally:
+            if message_batcher.enabled:
+                try:
+                    await message_batcher.drain()
+                except Exception as e:
+                    logger.error("Falha ao processar o último lote: %s", e)
+
             if connection and not connection.is_closed:
-                print("INFO: [requests_service] Consumidor: Fechando conexão RabbitMQ no finally do loop.")
+                logger.info("Fechando conexão RabbitMQ no finally do loop.")
                 await connection.close()
 
             current_task = asyncio.current_task()
             if current_task and current_task.cancelled():
-                print(
-                    "INFO: [requests_service] Consumidor: Saindo do loop de reconexão devido ao cancelamento (detectado no finally).")
+                logger.info("Saindo do loop de reconexão devido ao cancelamento (detectado no finally).")
                 break
 
-        print(f"INFO: [requests_service] Consumidor: Aguardando {retry_delay}s antes da próxima tentativa de conexão.")
-        await asyncio.sleep(retry_delay)
+        if stop_event.is_set():
+            break
+
+        logger.info("Aguardando %ds antes da próxima tentativa de conexão.", retry_delay)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=retry_delay)
+        except asyncio.TimeoutError:
+            pass
+
+    logger.info("Consumidor encerrado.")
 
 
 if __name__ == "__main__":
     try:
         asyncio.run(main_consumer())
     except KeyboardInterrupt:
-        print("Programa encerrado.")
\ No newline at end of file
+        logger.info("Programa encerrado.")
\ No newline at end of file
@@ -0,0 +1,170 @@
+import asyncio
+import os
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from messaging.request_event_publisher import (event_publisher, ROUTING_KEY_TEAM_CREATION_UPDATE,
+                                               ROUTING_KEY_TEAM_REMOVE_UPDATE, ROUTING_KEY_MEMBER_ADD_UPDATE,
+                                               ROUTING_KEY_MEMBER_REMOVE_UPDATE)
+from requests.models.outbox_event import OutboxEvent
+from requests.models.request import Request, RequestTypeEnum
+from shared.database import AsyncSessionLocal
+from shared.logger import get_logger
+
+logger = get_logger("outbox")
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1"))
+OUTBOX_RETRY_DELAY = 5
+
+ROUTING_KEYS_BY_REQUEST_TYPE = {
+    RequestTypeEnum.approve_team: ROUTING_KEY_TEAM_CREATION_UPDATE,
+    RequestTypeEnum.delete_team: ROUTING_KEY_TEAM_REMOVE_UPDATE,
+    RequestTypeEnum.add_team_member: ROUTING_KEY_MEMBER_ADD_UPDATE,
+    RequestTypeEnum.remove_team_member: ROUTING_KEY_MEMBER_REMOVE_UPDATE,
+}
+
+
+def build_request_update_event(request: Request) -> tuple[str, dict]:
+    """
+    Monta a routing key e o corpo do evento publicado quando uma solicitação é aprovada ou rejeitada.
+    """
+    message_data = {
+        "team_id": str(request.team_id),
+        "campus_code": request.campus_code,
+        "status": request.status.value,
+        "competition_id": str(request.competition_id),
+        "request_type": request.request_type.value,
+    }
+
+    if request.request_type in (RequestTypeEnum.add_team_member, RequestTypeEnum.remove_team_member):
+        message_data["user_id"] = str(request.user_id)
+
+    return ROUTING_KEYS_BY_REQUEST_TYPE[request.request_type], message_data
+
+
+def add_outbox_event(db: AsyncSession, routing_key: str, payload: dict) -> OutboxEvent:
+    """
+    Registra um evento na outbox. Ele só é gravado (e publicado) se a transação da sessão for confirmada.
+    """
+    event = OutboxEvent(routing_key=routing_key, payload=payload)
+    db.add(event)
+    return event
+
+
+class OutboxRelay:
+    """
+    Tarefa de fundo que drena a tabela `outbox_events` para o exchange de eventos de solicitações.
+
+    Cada ciclo bloqueia um lote de eventos com `FOR UPDATE SKIP LOCKED` (permitindo várias instâncias
+    da API em paralelo), publica os eventos em ordem, um por vez, aguardando a confirmação do broker, e
+    apaga os confirmados na mesma transação. Se uma publicação falhar, ela e as seguintes continuam na
+    tabela e são tentadas novamente no próximo ciclo.
+    """
+
+    def __init__(self, batch_size: int = OUTBOX_BATCH_SIZE, poll_interval: float = OUTBOX_POLL_INTERVAL):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+
+        self.published = 0
+        self.failures = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        """
+        Acorda o relay logo após um commit que gravou eventos, sem esperar o próximo ciclo de polling.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def metrics(self) -> dict:
+        return {
+            "published": self.published,
+            "failures": self.failures,
+        }
+
+    async def relay_batch(self) -> int:
+        """
+        Publica um lote de eventos pendentes e retorna quantos foram publicados.
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(OutboxEvent)
+                .order_by(OutboxEvent.created_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            events = result.scalars().all()
+
+            if not events:
+                return 0
+
+            # Um de cada vez, na ordem de `created_at`: publicações concorrentes podem chegar ao broker fora
+            # de ordem, e os consumidores precisam ver as decisões na ordem em que foram tomadas
+            published = []
+            try:
+                for event in events:
+                    await event_publisher.publish(event.routing_key, event.payload)
+                    published.append(event.id)
+            finally:
+                # Os eventos já confirmados saem da tabela mesmo que um dos seguintes falhe
+                if published:
+                    await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(published)))
+                    await db.commit()
+                    self.published += len(published)
+
+            logger.debug("%d eventos publicados em '%s'", len(published), event_publisher.exchange_name)
+            return len(published)
+
+    async def _run(self) -> None:
+        while True:
+            # Limpo antes do lote para que um notify() feito durante a publicação não se perca
+            self._wakeup.clear()
+
+            try:
+                published = await self.relay_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error("Falha ao publicar eventos: %s. Tentando novamente em %d segundos...",
+                             e, OUTBOX_RETRY_DELAY)
+                await asyncio.sleep(OUTBOX_RETRY_DELAY)
+                continue
+
+            # Lote cheio indica que ainda há eventos na tabela
+            if published >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+outbox_relay = OutboxRelay()
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+
+import aio_pika
+from sqlalchemy import select, delete
+
+from requests.models.processed_message import ProcessedMessage
+from shared.cache import LRUCache
+from shared.database import AsyncSessionLocal
+from shared.logger import get_logger
+
+PROCESSED_MESSAGES_CACHE_SIZE = int(os.getenv("PROCESSED_MESSAGES_CACHE_SIZE", "100000"))
+PROCESSED_MESSAGES_RETENTION_HOURS = float(os.getenv("PROCESSED_MESSAGES_RETENTION_HOURS", "24"))
+PROCESSED_MESSAGES_PRUNE_INTERVAL = float(os.getenv("PROCESSED_MESSAGES_PRUNE_INTERVAL_SECONDS", "3600"))
+PROCESSED_MESSAGES_PRUNE_BATCH_SIZE = 1000
+
+logger = get_logger("processed_messages")
+
+
+def message_key(message: aio_pika.IncomingMessage) -> str:
+    """
+    Identifica a mensagem pelo `message_id` do publicador ou, na falta dele, pelo conteúdo.
+
+    Sem `message_id`, duas mensagens idênticas na mesma routing key têm a mesma chave: a reentrega de
+    qualquer uma delas é descartada dentro do período de retenção.
+    """
+    routing_key = (message.routing_key or "").encode()
+    if message.message_id:
+        raw = b"id\0" + routing_key + b"\0" + str(message.message_id).encode()
+    else:
+        raw = b"body\0" + routing_key + b"\0" + message.body
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ProcessedMessageStore:
+    """
+    Registro das mensagens já gravadas, para descartar reentregas do RabbitMQ (por exemplo, após a queda
+    de um consumidor antes do ack) sem repetir a validação e a verificação de duplicidade no banco.
+
+    A tabela `processed_messages` é a fonte durável, escrita na mesma transação das solicitações; o LRU em
+    memória na frente dela evita ir ao banco. Só mensagens marcadas como reentregues pelo broker são
+    descartadas (primeiras entregas com a mesma chave, como um reenvio do produtor sem `message_id`, são
+    gravadas normalmente) e procuradas no banco quando não estão no LRU. O LRU é pré-carregado com as
+    chaves mais recentes quando o consumidor inicia.
+    """
+
+    def __init__(self, cache_size: int = PROCESSED_MESSAGES_CACHE_SIZE,
+                 retention_hours: float = PROCESSED_MESSAGES_RETENTION_HOURS,
+                 prune_interval: float = PROCESSED_MESSAGES_PRUNE_INTERVAL):
+        self.retention = timedelta(hours=retention_hours)
+        self.prune_interval = prune_interval
+
+        self._cache = LRUCache(cache_size, default_ttl=self.retention.total_seconds())
+        self._warmed = False
+        self._prune_task: asyncio.Task | None = None
+
+        self.skipped = 0
+        self.db_lookups = 0
+        self.pruned = 0
+
+    def seen(self, key: str) -> bool:
+        return self._cache.get(key) is not None
+
+    def mark(self, keys) -> None:
+        for key in keys:
+            self._cache.set(key, True)
+
+    def skip(self) -> None:
+        self.skipped += 1
+
+    async def recorded(self, keys: list[str]) -> set[str]:
+        """
+        Procura no banco as chaves que não estão no LRU; as encontradas passam a ficar em memória.
+        """
+        if not keys:
+            return set()
+
+        self.db_lookups += 1
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ProcessedMessage.message_key).where(ProcessedMessage.message_key.in_(keys)))
+            found = set(result.scalars().all())
+
+        self.mark(found)
+        return found
+
+    async def warm(self) -> None:
+        """
+        Carrega no LRU as chaves mais recentes, que são as que o broker pode reentregar após um reinício.
+        """
+        if self._warmed:
+            return
+
+        cutoff = datetime.now(timezone.utc) - self.retention
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ProcessedMessage.message_key)
+                .where(ProcessedMessage.processed_at >= cutoff)
+                .order_by(ProcessedMessage.processed_at.desc())
+                .limit(self._cache.max_size)
+            )
+            keys = result.scalars().all()
+
+        # Do mais antigo para o mais recente, para que os mais recentes sejam os últimos a sair do LRU
+        self.mark(reversed(keys))
+        self._warmed = True
+        logger.info("%d mensagens processadas carregadas em memória", len(keys))
+
+    async def prune(self) -> int:
+        """
+        Apaga, em lotes, os registros mais antigos que o período de retenção.
+        """
+        cutoff = datetime.now(timezone.utc) - self.retention
+        total = 0
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                expired = (
+                    select(ProcessedMessage.message_key)
+                    .where(ProcessedMessage.processed_at < cutoff)
+                    .limit(PROCESSED_MESSAGES_PRUNE_BATCH_SIZE)
+                )
+                result = await db.execute(
+                    delete(ProcessedMessage)
+                    .where(ProcessedMessage.message_key.in_(expired.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+
+            total += result.rowcount
+            if result.rowcount < PROCESSED_MESSAGES_PRUNE_BATCH_SIZE:
+                break
+
+        self.pruned += total
+        return total
+
+    def start_pruning(self) -> None:
+        if self._prune_task is not None and not self._prune_task.done():
+            return
+
+        self._prune_task = asyncio.create_task(self._prune_periodically())
+
+    async def stop_pruning(self) -> None:
+        if self._prune_task is None:
+            return
+
+        self._prune_task.cancel()
+        try:
+            await self._prune_task
+        except asyncio.CancelledError:
+            pass
+        self._prune_task = None
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            try:
+                pruned = await self.prune()
+                if pruned:
+                    logger.info("%d registros de mensagens processadas removidos", pruned)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Falha ao remover registros de mensagens processadas: %s", e)
+
+            await asyncio.sleep(self.prune_interval)
+
+    def metrics(self) -> dict:
+        return {
+            "skipped": self.skipped,
+            "db_lookups": self.db_lookups,
+            "pruned": self.pruned,
+            "cache": self._cache.stats(),
+        }
+
+
+processed_messages = ProcessedMessageStore()
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import uuid
+
+import aio_pika
+
+from messaging.codec import codec
+from messaging.request_event_publisher import RABBITMQ_URL
+from services.request_events import request_event_hub
+from shared.logger import get_logger
+from shared.responses import dumps_json
+
+logger = get_logger("request_events_broadcast")
+
+REQUEST_EVENTS_BROADCAST_EXCHANGE = "requests_live_events_exchange"
+REQUEST_EVENTS_BROADCAST_QUEUE_SIZE = int(os.getenv("REQUEST_EVENTS_BROADCAST_QUEUE_SIZE", "1000"))
+REQUEST_EVENTS_BROADCAST_RETRY_DELAY = 5
+
+
+class RequestEventBroadcaster:
+    """
+    Repassa os eventos do `request_event_hub` entre processos por um exchange fanout do RabbitMQ.
+
+    Cada processo publica no exchange os eventos gerados localmente (pelo consumidor ou pelas rotas de
+    decisão) e, com `receive=True`, consome por uma fila exclusiva os eventos dos demais processos, entregando-os
+    aos clientes conectados ao seu stream. As mensagens do próprio processo são ignoradas, pois já foram
+    entregues localmente.
+
+    Os eventos não são persistidos: se a conexão com o broker cair, os clientes locais recebem `resync` ao
+    reconectar, para recarregar a listagem em vez de seguir com um fluxo incompleto.
+    """
+
+    def __init__(self, url: str, exchange_name: str, queue_size: int = REQUEST_EVENTS_BROADCAST_QUEUE_SIZE):
+        self.url = url
+        self.exchange_name = exchange_name
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._receive = False
+
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, receive: bool = True) -> None:
+        """
+        Inicia o repasse. `receive=False` apenas publica, para processos sem clientes do stream (workers do consumidor).
+        """
+        if self.is_running:
+            return
+
+        self._receive = receive
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        request_event_hub.set_forwarder(self.forward)
+
+    async def stop(self) -> None:
+        request_event_hub.set_forwarder(None)
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def forward(self, campus_code: str, event_type: str, events: list[dict]) -> None:
+        try:
+            self._queue.put_nowait((campus_code, event_type, events))
+        except asyncio.QueueFull:
+            self.dropped += len(events)
+            logger.warning("Fila de repasse de eventos cheia, eventos descartados", extra={"campus_code": campus_code})
+
+    def metrics(self) -> dict:
+        return {
+            "running": self.is_running,
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def _on_reconnect(self, *args, **kwargs) -> None:
+        self.reconnects += 1
+        request_event_hub.resync_all()
+
+    async def _on_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        if message.app_id == self.origin:
+            return
+
+        try:
+            data = codec.loads(message.body)
+            request_event_hub.deliver(data["campus_code"], data["event_type"], data["events"])
+            self.received += 1
+        except Exception as e:
+            logger.error("Evento repassado inválido: %s", e)
+
+    async def _run(self) -> None:
+        connected_before = False
+        while True:
+            try:
+                connection = await aio_pika.connect_robust(self.url)
+                async with connection:
+                    connection.reconnect_callbacks.add(self._on_reconnect)
+                    channel = await connection.channel()
+                    exchange = await channel.declare_exchange(
+                        self.exchange_name, aio_pika.ExchangeType.FANOUT, durable=True)
+
+                    if self._receive:
+                        queue = await channel.declare_queue(None, exclusive=True, auto_delete=True)
+                        await queue.bind(exchange)
+                        await queue.consume(self._on_message, no_ack=True)
+
+                    # Eventos de outros processos publicados enquanto não havia conexão não chegaram aqui
+                    if connected_before:
+                        self.reconnects += 1
+                    request_event_hub.resync_all()
+                    connected_before = True
+
+                    while True:
+                        campus_code, event_type, events = await self._queue.get()
+                        message = aio_pika.Message(
+                            body=dumps_json({"campus_code": campus_code, "event_type": event_type, "events": events}),
+                            content_type="application/json",
+                            app_id=self.origin,
+                            delivery_mode=aio_pika.DeliveryMode.NOT_PERSISTENT
+                        )
+                        try:
+                            await exchange.publish(message, routing_key="")
+                            self.sent += 1
+                        except Exception as e:
+                            # Os outros processos perdem só estes eventos; a conexão robusta se recupera sozinha
+                            self.dropped += len(events)
+                            logger.error("Falha ao repassar eventos: %s", e, extra={"campus_code": campus_code})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Falha na conexão do repasse de eventos: %s. Tentando novamente em %d segundos...",
+                             e, REQUEST_EVENTS_BROADCAST_RETRY_DELAY)
+                await asyncio.sleep(REQUEST_EVENTS_BROADCAST_RETRY_DELAY)
+
+
+request_event_broadcaster = RequestEventBroadcaster(RABBITMQ_URL, REQUEST_EVENTS_BROADCAST_EXCHANGE)
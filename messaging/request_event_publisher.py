@@ -1,6 +1,14 @@
+import asyncio
 import aio_pika
-import json
 import os
+import time
+from aio_pika.pool import Pool
+
+from messaging.codec import codec
+from shared.logger import get_logger
+from shared.metrics import PUBLISH_DURATION
+
+logger = get_logger("event_publisher")
 
 RABBITMQ_USER_DEFAULT = "guest"
 RABBITMQ_PASSWORD_DEFAULT = "guest"
@@ -25,157 +33,101 @@ if not RABBITMQ_URL:
         vhost_path = vhost
 
     RABBITMQ_URL = f"amqp://{user}:{password}@{host}:{port}{vhost_path}"
-    print(f"INFO: RABBITMQ_URL não estava definida no ambiente. URL montada: {RABBITMQ_URL}")
+    logger.info("RABBITMQ_URL não estava definida no ambiente. URL montada: %s", RABBITMQ_URL)
 else:
-    print(f"INFO: Usando RABBITMQ_URL definida no ambiente: {RABBITMQ_URL}")
+    logger.info("Usando RABBITMQ_URL definida no ambiente: %s", RABBITMQ_URL)
 
 
 REQUESTS_EVENTS_EXCHANGE = "requests_events_exchange"
 
+PUBLISHER_CHANNEL_POOL_SIZE = int(os.getenv("RABBITMQ_PUBLISHER_CHANNEL_POOL_SIZE", "4"))
+PUBLISHER_CONFIRM_TIMEOUT = float(os.getenv("RABBITMQ_PUBLISHER_CONFIRM_TIMEOUT", "10"))
 
-async def publish_team_creation_request(team_data: dict):
-    """
-    Publica uma mensagem indicando que a criação de uma equipe foi atualizada.
-    """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                REQUESTS_EVENTS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
-            )
-
-            message_body = json.dumps(team_data).encode()
-
-            routing_key = "team.creation.update"
-
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
-
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
-
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
+ROUTING_KEY_TEAM_CREATION_UPDATE = "team.creation.update"
+ROUTING_KEY_TEAM_REMOVE_UPDATE = "team.remove.update"
+ROUTING_KEY_MEMBER_ADD_UPDATE = "member.add.update"
+ROUTING_KEY_MEMBER_REMOVE_UPDATE = "member.remove.update"
 
 
-async def publish_team_remove_request(team_data: dict):
+class RequestEventPublisher:
     """
-    Publica uma mensagem indicando que a remoção de uma equipe foi atualizada.
-    """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+    Publicador de longa duração para o exchange de eventos de solicitações.
 
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                REQUESTS_EVENTS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
-            )
-
-            message_body = json.dumps(team_data).encode()
-
-            routing_key = "team.remove.update"
-
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
-
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
-
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
-
-
-async def publish_member_add_request(team_data: dict):
+    Mantém uma única conexão robusta aberta durante o ciclo de vida da aplicação, um pool de canais
+    com publisher confirms e o exchange já declarado em cada canal, de forma que cada publicação custa
+    apenas o envio da mensagem e a espera pela confirmação do broker.
     """
-    Publica uma mensagem indicando que a adição de um membro da equipe foi atualizada.
-    """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
 
-        async with connection.channel() as channel:
-            exchange = await channel.declare_exchange(
-                REQUESTS_EVENTS_EXCHANGE,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
-            )
+    def __init__(self, url: str, exchange_name: str, pool_size: int = PUBLISHER_CHANNEL_POOL_SIZE):
+        self.url = url
+        self.exchange_name = exchange_name
+        self.pool_size = pool_size
 
-            message_body = json.dumps(team_data).encode()
+        self._connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self._channel_pool: Pool | None = None
+        self._exchanges: dict = {}
+        self._lock = asyncio.Lock()
 
-            routing_key = "member.add.update"
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed
 
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
+    async def connect(self) -> None:
+        async with self._lock:
+            if self.is_connected:
+                return
 
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
+            self._connection = await aio_pika.connect_robust(self.url)
+            self._channel_pool = Pool(self._create_channel, max_size=self.pool_size)
+            self._exchanges = {}
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
+    async def close(self) -> None:
+        async with self._lock:
+            if self._channel_pool is not None:
+                await self._channel_pool.close()
+                self._channel_pool = None
 
+            if self._connection is not None and not self._connection.is_closed:
+                await self._connection.close()
 
-async def publish_member_remove_request(team_data: dict):
-    """
-    Publica uma mensagem indicando que a remoção de um membro da equipe foi atualizada.
-    """
-    connection = None
-    try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+            self._connection = None
+            self._exchanges = {}
+
+    async def _create_channel(self) -> aio_pika.abc.AbstractChannel:
+        return await self._connection.channel(publisher_confirms=True)
 
-        async with connection.channel() as channel:
+    async def _get_exchange(self, channel: aio_pika.abc.AbstractChannel) -> aio_pika.abc.AbstractExchange:
+        # O canal robusto redeclara o exchange sozinho após uma reconexão, então basta declará-lo uma vez
+        exchange = self._exchanges.get(channel)
+        if exchange is None:
             exchange = await channel.declare_exchange(
-                REQUESTS_EVENTS_EXCHANGE,
+                self.exchange_name,
                 aio_pika.ExchangeType.DIRECT,
                 durable=True
             )
+            self._exchanges[channel] = exchange
+        return exchange
 
-            message_body = json.dumps(team_data).encode()
+    async def publish(self, routing_key: str, data: dict) -> None:
+        """
+        Publica `data` com a routing key informada e aguarda a confirmação do broker. Erros são propagados
+        para quem chamou.
+        """
+        if not self.is_connected:
+            await self.connect()
 
-            routing_key = "member.remove.update"
+        message = aio_pika.Message(
+            body=codec.dumps(data),
+            content_type="application/json",
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        )
+
+        start = time.perf_counter()
+        async with self._channel_pool.acquire() as channel:
+            exchange = await self._get_exchange(channel)
+            await exchange.publish(message, routing_key=routing_key, timeout=PUBLISHER_CONFIRM_TIMEOUT)
+        PUBLISH_DURATION.labels(routing_key=routing_key).observe(time.perf_counter() - start)
 
-            message = aio_pika.Message(
-                body=message_body,
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            )
 
-            await exchange.publish(message, routing_key=routing_key)
-            print(f" [teams_service] Sent '{routing_key}':'{team_data}'")
+event_publisher = RequestEventPublisher(RABBITMQ_URL, REQUESTS_EVENTS_EXCHANGE)
 
-    except aio_pika.exceptions.AMQPConnectionError as e:
-        print(f"Erro de conexão com RabbitMQ: {e}")
-    except Exception as e:
-        print(f"Erro ao publicar mensagem: {e}")
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
\ No newline at end of file
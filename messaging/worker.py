@@ -0,0 +1,106 @@
+"""
+Processo dedicado ao consumo das filas, separado da API.
+
+Uso:
+    RUN_CONSUMER_IN_API=false uvicorn main:app ...
+    python -m messaging.worker --workers 4
+
+Cada worker é um processo com seu próprio event loop, conexão com o RabbitMQ e pool do banco.
+SIGTERM/SIGINT encerram os workers de forma graciosa (veja `main_consumer`).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+
+CONSUMER_WORKERS = int(os.getenv("CONSUMER_WORKERS", "1"))
+WORKER_RESTART_DELAY = 5
+
+
+async def run_worker(metrics_port: int | None) -> None:
+    from messaging.consumers import main_consumer
+    from messaging.request_event_broadcast import request_event_broadcaster
+    from shared.database import engine
+
+    if metrics_port:
+        from prometheus_client import start_http_server
+        start_http_server(metrics_port)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop_event.set)
+
+    # As solicitações criadas aqui chegam ao stream de eventos dos processos da API pelo broker
+    request_event_broadcaster.start(receive=False)
+    try:
+        await main_consumer(stop_event)
+    finally:
+        await request_event_broadcaster.stop()
+        await engine.dispose()
+
+
+def worker_main(index: int, metrics_port: int | None) -> None:
+    from shared.logger import get_logger, shutdown_logging
+
+    logger = get_logger("worker")
+    logger.info("Worker %d iniciado (pid %d).", index, os.getpid())
+    try:
+        asyncio.run(run_worker(metrics_port + index if metrics_port else None))
+    finally:
+        logger.info("Worker %d encerrado.", index)
+        shutdown_logging()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=CONSUMER_WORKERS)
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Porta do /metrics do primeiro worker; os demais usam as portas seguintes")
+    args = parser.parse_args()
+
+    from shared.logger import get_logger
+    logger = get_logger("worker")
+
+    # "spawn" para que cada worker crie sua própria thread de logs, conexões e event loop
+    context = multiprocessing.get_context("spawn")
+    processes: dict[int, multiprocessing.Process] = {}
+    stopping = False
+
+    def start(index: int) -> None:
+        process = context.Process(target=worker_main, args=(index, args.metrics_port), name=f"consumer-{index}")
+        process.start()
+        processes[index] = process
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(args.workers):
+        start(index)
+
+    while processes:
+        for index, process in list(processes.items()):
+            process.join(timeout=1)
+            if process.is_alive():
+                continue
+
+            del processes[index]
+            if not stopping:
+                logger.warning("Worker %d terminou com código %s; reiniciando em %ds.",
+                               index, process.exitcode, WORKER_RESTART_DELAY)
+                time.sleep(WORKER_RESTART_DELAY)
+                if not stopping:
+                    start(index)
+
+
+if __name__ == "__main__":
+    main()
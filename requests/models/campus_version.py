@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, BigInteger
+from shared.database import Base
+
+
+class CampusVersion(Base):
+    """
+    Versão das solicitações de cada campus, incrementada na mesma transação que cria ou decide
+    solicitações. Serve de base para o ETag da listagem e dos detalhes.
+    """
+    __tablename__ = "campus_versions"
+
+    campus_code: str = Column(String(100), primary_key=True)
+    version: int = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, UUID, JSON, Index
+import uuid
+from datetime import datetime, timezone
+from shared.database import Base
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id: uuid.UUID = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    routing_key: str = Column(String(255), nullable=False)
+    payload: dict = Column(JSON, nullable=False)
+    created_at: datetime = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+
+    __table_args__ = (
+        Index('ix_outbox_events_created_at', 'created_at'),
+    )
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, String, DateTime, Index
+from shared.database import Base
+
+
+class ProcessedMessage(Base):
+    """
+    Mensagens do RabbitMQ já gravadas pelo consumidor, registradas na mesma transação que as solicitações
+    criadas. Permite descartar reentregas sem repetir a validação e a verificação de duplicidade.
+    """
+    __tablename__ = "processed_messages"
+
+    message_key: str = Column(String(64), primary_key=True)
+    processed_at: datetime = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+
+    __table_args__ = (
+        Index('ix_processed_messages_processed_at', 'processed_at'),
+    )
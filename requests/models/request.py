@@ -1,10 +1,10 @@
-from sqlalchemy import Column, String, Enum as SQLEnum, DateTime, UUID, ForeignKey
+from sqlalchemy import Column, String, Enum as SQLEnum, DateTime, UUID, ForeignKey, Index, text
 import uuid
 from enum import Enum as PyEnum
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
 from shared.database import Base
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class RequestTypeEnum(str, PyEnum):
@@ -20,6 +20,16 @@ class RequestStatusEnum(str, PyEnum):
     rejected = "rejected"
 
 
+class RequestSortEnum(str, PyEnum):
+    created_at_desc = "created_at_desc"
+    created_at_asc = "created_at_asc"
+
+
+class RequestExportFormatEnum(str, PyEnum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
 class Request(Base):
     __tablename__ = "requests"
 
@@ -41,11 +51,74 @@ class Request(Base):
         default=lambda: datetime.now(timezone.utc),
         nullable=False
     )
+    decided_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_requests_campus_created', 'campus_code', 'created_at', 'id'),
+        Index('ix_requests_campus_status_created', 'campus_code', 'status', 'created_at', 'id'),
+        Index('ix_requests_campus_type_created', 'campus_code', 'request_type', 'created_at', 'id'),
+        Index('ix_requests_pending_dedupe', 'team_id', 'campus_code', 'request_type', 'user_id',
+              postgresql_where=text("status = 'pendent'")),
+        Index('ix_requests_approved_team', 'team_id', 'campus_code',
+              postgresql_where=text("status = 'approved' AND request_type = 'approve_team'")),
+        Index('ix_requests_decided_at', 'decided_at',
+              postgresql_where=text("status <> 'pendent'")),
+    )
+
+
+class ArchivedRequest(Base):
+    """
+    Solicitações decididas há mais tempo, movidas de `requests` pelo arquivador. Nunca voltam a mudar.
+    Tem as mesmas colunas de `requests`, mais a data do arquivamento.
+    """
+    __tablename__ = "requests_archive"
+
+    id: uuid.UUID = Column(UUID(as_uuid=True), primary_key=True)
+    request_type: RequestTypeEnum = Column(SQLEnum(RequestTypeEnum), nullable=False)
+    team_id: uuid.UUID = Column(UUID(as_uuid=True), nullable=False)
+    competition_id: Optional[uuid.UUID] = Column(UUID(as_uuid=True), nullable=True)
+    user_id: Optional[str] = Column(String, nullable=True)
+    campus_code: str = Column(String(100), nullable=False)
+    reason: Optional[str] = Column(String, nullable=True)
+    reason_rejected: Optional[str] = Column(String, nullable=True)
+    status: RequestStatusEnum = Column(
+        SQLEnum(RequestStatusEnum),
+        nullable=False
+    )
+    created_at: datetime = Column(
+        DateTime(timezone=True),
+        nullable=False
+    )
+    decided_at: datetime = Column(
+        DateTime(timezone=True),
+        nullable=False
+    )
+    archived_at: datetime = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+
+    __table_args__ = (
+        Index('ix_requests_archive_campus_created', 'campus_code', 'created_at', 'id'),
+        Index('ix_requests_archive_campus_status_created', 'campus_code', 'status', 'created_at', 'id'),
+        Index('ix_requests_archive_campus_type_created', 'campus_code', 'request_type', 'created_at', 'id'),
+        Index('ix_requests_archive_approved_team', 'team_id', 'campus_code',
+              postgresql_where=text("status = 'approved' AND request_type = 'approve_team'")),
+    )
 
 class RequestsPutRequest(BaseModel):
     reason_rejected: Optional[str] = None
     status: RequestStatusEnum
 
+class RequestDecision(BaseModel):
+    id: uuid.UUID
+    status: RequestStatusEnum
+    reason_rejected: Optional[str] = None
+
+class RequestsBulkPutRequest(BaseModel):
+    decisions: List[RequestDecision] = Field(..., min_length=1, max_length=500)
+
 class RequestsCreateRequest(BaseModel):
     request_type: RequestTypeEnum
     team_id: uuid.UUID
@@ -67,4 +140,26 @@ class RequestsResponse(BaseModel):
 
     model_config = {
         "from_attributes": True
-    }
\ No newline at end of file
+    }
+
+
+# Campos expostos de uma solicitação, na ordem de RequestsResponse. As colunas de `requests` e
+# `requests_archive` têm os mesmos nomes, então a listagem, a exportação, os eventos e o arquivador usam esta lista.
+REQUEST_FIELDS = tuple(RequestsResponse.model_fields)
+
+
+class RequestsPageResponse(BaseModel):
+    items: List[RequestsResponse]
+    next_cursor: Optional[str] = None
+
+
+class RequestsBulkResponse(BaseModel):
+    updated: List[RequestsResponse]
+    skipped: List[uuid.UUID]
+
+
+class RequestsStatsResponse(BaseModel):
+    campus_code: str
+    total: int
+    by_status: Dict[RequestStatusEnum, int]
+    by_type: Dict[RequestTypeEnum, Dict[RequestStatusEnum, int]]
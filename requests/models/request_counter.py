@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Enum as SQLEnum, BigInteger
+from shared.database import Base
+from requests.models.request import RequestTypeEnum, RequestStatusEnum
+
+
+class RequestCounter(Base):
+    """
+    Quantidade de solicitações por campus, tipo e status, mantida na mesma transação
+    que cria ou decide as solicitações.
+    """
+    __tablename__ = "request_counters"
+
+    campus_code: str = Column(String(100), primary_key=True)
+    request_type: RequestTypeEnum = Column(SQLEnum(RequestTypeEnum), primary_key=True)
+    status: RequestStatusEnum = Column(SQLEnum(RequestStatusEnum), primary_key=True)
+    count: int = Column(BigInteger, nullable=False, default=0)
@@ -1,35 +1,81 @@
+import os
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Header, Response
 from fastapi import Request as RequestObject
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth import get_current_user
-from messaging.request_event_publisher import publish_team_creation_request, publish_team_remove_request, \
-    publish_member_add_request, publish_member_remove_request
+from messaging.outbox import build_request_update_event, add_outbox_event, outbox_relay
 from shared.auth_utils import has_role
 from shared.exceptions import NotFound, Conflict
+from shared.pagination import encode_cursor, decode_cursor
 
 import uuid
 
-from requests.models.request import (RequestStatusEnum, Request,
-                                     RequestsResponse, RequestsPutRequest, RequestsCreateRequest, RequestTypeEnum)
+from requests.models.request import (RequestStatusEnum, Request, ArchivedRequest,
+                                     RequestsResponse, RequestsPutRequest, RequestsCreateRequest, RequestTypeEnum,
+                                     RequestSortEnum, RequestsPageResponse, RequestsBulkPutRequest,
+                                     RequestsBulkResponse, RequestDecision, RequestsStatsResponse,
+                                     RequestExportFormatEnum, REQUEST_FIELDS)
+from requests.models.request_counter import RequestCounter
 from shared.dependencies import get_db
+from services.crud import transition_pending_requests
+from services.request_cache import get_cached_request, cache_request, invalidate_requests
+from services.request_versions import get_campus_version, build_etag, etag_matches
+from services.request_archive import union_requests, find_request
+from services.request_export import stream_export, EXPORT_MEDIA_TYPES
+from services.request_events import request_event_hub, stream_events, EVENT_REQUEST_UPDATED
 
 from messaging.audit_publisher import generate_log_payload, run_async_audit, model_to_dict
+from shared.responses import FastJSONResponse
+
+DEFAULT_PAGE_SIZE = int(os.getenv("REQUESTS_PAGE_SIZE_DEFAULT", "50"))
+MAX_PAGE_SIZE = int(os.getenv("REQUESTS_PAGE_SIZE_MAX", "200"))
 
 router = APIRouter(
     prefix='/api/v1/requests',
-    tags=['Requests']
+    tags=['Requests'],
+    default_response_class=FastJSONResponse
 )
 
+def _list_columns(model) -> tuple:
+    # Campos de RequestsResponse, lidos sem montar objetos do ORM na listagem e na exportação
+    return tuple(getattr(model, field) for field in REQUEST_FIELDS)
+
+
+def select_requests(model, campus_code: str, status: Optional[RequestStatusEnum] = None,
+                    request_type: Optional[RequestTypeEnum] = None):
+    """
+    SELECT dos campos da listagem em `model` (`Request` ou `ArchivedRequest`), filtrado por campus e,
+    opcionalmente, por status e tipo. Usado pela listagem e pela exportação.
+    """
+    query = select(*_list_columns(model)).where(model.campus_code == campus_code)
+
+    if status:
+        query = query.where(model.status == status.value)
+
+    if request_type:
+        query = query.where(model.request_type == request_type.value)
+
+    return query
+
 
-@router.get('/', response_model=List[RequestsResponse])
-def get_requests(status: Optional[RequestStatusEnum] = Query(None, description="Filtrar solicitações por status"),
+@router.get('/', response_model=RequestsPageResponse)
+async def get_requests(status: Optional[RequestStatusEnum] = Query(None, description="Filtrar solicitações por status"),
                  request_type: Optional[RequestTypeEnum] = Query(
                      None, description="Filtrar solicitações por tipo"),
-                 db: Session = Depends(get_db),
+                 limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE,
+                                    description="Quantidade máxima de solicitações por página"),
+                 cursor: Optional[str] = Query(
+                     None, description="Cursor retornado em `next_cursor` pela página anterior"),
+                 sort: RequestSortEnum = Query(RequestSortEnum.created_at_desc,
+                                               description="Ordenação por data de criação"),
+                 if_none_match: Optional[str] = Header(None),
+                 db: AsyncSession = Depends(get_db),
                  current_user: dict = Depends(get_current_user)):
     """
     List Requests
@@ -37,51 +83,94 @@ def get_requests(status: Optional[RequestStatusEnum] = Query(None, description="
     Lista as solicitações pendentes, aprovadas ou rejeitadas. O acesso é restrito para usuários com o papel 'Organizador'.
     É possível filtrar a lista por status (ex: `pending`) ou por tipo de solicitação (ex: `approve_team`).
 
+    A listagem é paginada por cursor sobre `(created_at, id)`. Para buscar a próxima página, envie o valor de
+    `next_cursor` no parâmetro `cursor`, mantendo os mesmos filtros e a mesma ordenação. Quando `next_cursor`
+    for `null`, não há mais resultados.
+
+    A resposta traz um `ETag` derivado da versão das solicitações do campus. Enviando-o em `If-None-Match`,
+    a API responde `304 Not Modified` sem consultar as solicitações enquanto nada mudar no campus.
+
     **Exemplo de Resposta:**
 
     .. code-block:: json
 
-       [
-         {
-           "id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
-           "request_type": "approve_team",
-           "status": "pending",
-           "reason": null,
-           "reason_rejected": null,
-           "campus_code": "NAT-CN",
-           "team_id": "c1d2e3f4-a5b6-b7c8-d9e0-f1a2b3c4d5e6",
-           "user_id": null,
-           "competition_id": "d1e2f3a4-b5c6-d7e8-f9a0-b1c2d3e4f5a6",
-           "created_at": "2025-08-04T21:14:25.123Z"
-         },
-         {
-           "id": "b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7",
-           "request_type": "add_team_member",
-           "status": "pending",
-           "reason": null,
-           "reason_rejected": null,
-           "campus_code": "NAT-CN",
-           "team_id": "c1d2e3f4-a5b6-b7c8-d9e0-f1a2b3c4d5e6",
-           "user_id": "20231012030015",
-           "competition_id": null,
-           "created_at": "2025-08-04T22:30:00.000Z"
-         }
-       ]
+       {
+         "items": [
+           {
+             "id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
+             "request_type": "approve_team",
+             "status": "pending",
+             "reason": null,
+             "reason_rejected": null,
+             "campus_code": "NAT-CN",
+             "team_id": "c1d2e3f4-a5b6-b7c8-d9e0-f1a2b3c4d5e6",
+             "user_id": null,
+             "competition_id": "d1e2f3a4-b5c6-d7e8-f9a0-b1c2d3e4f5a6",
+             "created_at": "2025-08-04T21:14:25.123Z"
+           },
+           {
+             "id": "b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7",
+             "request_type": "add_team_member",
+             "status": "pending",
+             "reason": null,
+             "reason_rejected": null,
+             "campus_code": "NAT-CN",
+             "team_id": "c1d2e3f4-a5b6-b7c8-d9e0-f1a2b3c4d5e6",
+             "user_id": "20231012030015",
+             "competition_id": null,
+             "created_at": "2025-08-04T22:30:00.000Z"
+           }
+         ],
+         "next_cursor": "MjAyNS0wOC0wNFQyMjozMDowMCswMDowMHxiMmMzZDRlNS1mNmE3LWI4YzktZDBlMS1mMmEzYjRjNWQ2ZTc"
+       }
     """
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    query = db.query(Request).filter(
-        Request.campus_code == campus_code)  # type: ignore
+    cursor_key = None
+    if cursor:
+        try:
+            cursor_key = tuple_(*decode_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor inválido.")
 
-    if status:
-        query = query.filter(Request.status == status.value)
+    def build_query(model):
+        query = select_requests(model, campus_code, status, request_type)
 
-    if request_type:
-        query = query.filter(Request.request_type == request_type.value)
+        if cursor_key is not None:
+            sort_key = tuple_(model.created_at, model.id)
+            if sort == RequestSortEnum.created_at_asc:
+                query = query.where(sort_key > cursor_key)
+            else:
+                query = query.where(sort_key < cursor_key)
+
+        return query
+
+    def order_by(columns):
+        if sort == RequestSortEnum.created_at_asc:
+            return columns.created_at.asc(), columns.id.asc()
+        return columns.created_at.desc(), columns.id.desc()
 
     if has_role(groups, "Organizador"):
-        return query.all()
+        # A versão é lida antes das solicitações: o conteúdo nunca é mais antigo que o ETag enviado
+        version = await get_campus_version(db, campus_code)
+        etag = build_etag(campus_code, version, status, request_type, limit, cursor, sort)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        # Busca um item a mais para saber se existe uma próxima página sem precisar de COUNT.
+        # Solicitações arquivadas entram na mesma página, com o limite aplicado em cada tabela.
+        result = await db.execute(union_requests(build_query, order_by, limit=limit + 1))
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        # As linhas já têm exatamente os campos de RequestsResponse e vão direto para o orjson
+        return FastJSONResponse({"items": [row._asdict() for row in rows], "next_cursor": next_cursor},
+                                headers={"ETag": etag})
 
     else:
         raise HTTPException(
@@ -90,15 +179,167 @@ def get_requests(status: Optional[RequestStatusEnum] = Query(None, description="
         )
 
 
-@router.get('/{request_id}', response_model=RequestsResponse, status_code=200)
-def details_request(request_id: uuid.UUID,
-                    db: Session = Depends(get_db),
-                    current_user: dict = Depends(get_current_user)) -> RequestsResponse:
+@router.get('/stats', response_model=RequestsStatsResponse, status_code=200)
+async def get_requests_stats(db: AsyncSession = Depends(get_db),
+                             current_user: dict = Depends(get_current_user)):
+    """
+    Get Requests Statistics
+
+    Retorna a quantidade de solicitações do campus do usuário por status e por tipo.
+    Os valores vêm de contadores atualizados junto com cada solicitação, sem percorrer a tabela de solicitações.
+    O acesso é restrito para usuários com o papel 'Organizador'.
+
+    **Exemplo de Resposta:**
+
+    .. code-block:: json
+
+       {
+         "campus_code": "NAT-CN",
+         "total": 12,
+         "by_status": {"pendent": 3, "approved": 8, "rejected": 1},
+         "by_type": {
+           "approve_team": {"pendent": 1, "approved": 6, "rejected": 1},
+           "delete_team": {"pendent": 0, "approved": 1, "rejected": 0},
+           "remove_team_member": {"pendent": 1, "approved": 0, "rejected": 0},
+           "add_team_member": {"pendent": 1, "approved": 1, "rejected": 0}
+         }
+       }
+    """
+    campus_code = current_user["campus"]
+    groups = current_user["groups"]
+
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para visualizar as solicitações."
+        )
+
+    result = await db.execute(
+        select(RequestCounter.request_type, RequestCounter.status, RequestCounter.count).where(
+            RequestCounter.campus_code == campus_code)
+    )
+
+    by_status = {request_status: 0 for request_status in RequestStatusEnum}
+    by_type = {request_type: {request_status: 0 for request_status in RequestStatusEnum}
+               for request_type in RequestTypeEnum}
+
+    for row in result:
+        by_status[row.status] += row.count
+        by_type[row.request_type][row.status] += row.count
+
+    return {
+        "campus_code": campus_code,
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_type": by_type,
+    }
+
+
+@router.get('/export', status_code=200)
+async def export_requests(export_format: RequestExportFormatEnum = Query(
+                              RequestExportFormatEnum.ndjson, alias="format", description="`ndjson` ou `csv`"),
+                          status: Optional[RequestStatusEnum] = Query(None, description="Filtrar solicitações por status"),
+                          request_type: Optional[RequestTypeEnum] = Query(
+                              None, description="Filtrar solicitações por tipo"),
+                          created_from: Optional[datetime] = Query(
+                              None, description="Criadas a partir desta data (inclusive)"),
+                          created_to: Optional[datetime] = Query(
+                              None, description="Criadas antes desta data"),
+                          current_user: dict = Depends(get_current_user)):
+    """
+    Export Requests
+
+    Exporta todas as solicitações do campus do usuário, em ordem de criação, como NDJSON (um objeto por linha,
+    com os campos da listagem) ou CSV (com cabeçalho). Aceita os mesmos filtros da listagem e um intervalo de
+    datas de criação. A resposta é enviada aos poucos, conforme as linhas são lidas do banco, sem paginação.
+    O acesso é restrito para usuários com o papel 'Organizador'.
+
+    **Exemplo de Resposta (NDJSON):**
+
+    .. code-block:: text
+
+       {"id": "a1b2c3d4-...", "request_type": "approve_team", "status": "approved", ..., "created_at": "2025-08-04T21:14:25.123Z"}
+       {"id": "b2c3d4e5-...", "request_type": "add_team_member", "status": "pendent", ..., "created_at": "2025-08-04T22:30:00.000Z"}
+    """
+    campus_code = current_user["campus"]
+    groups = current_user["groups"]
+
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para visualizar as solicitações."
+        )
+
+    def build_query(model):
+        query = select_requests(model, campus_code, status, request_type)
+
+        if created_from:
+            query = query.where(model.created_at >= created_from)
+
+        if created_to:
+            query = query.where(model.created_at < created_to)
+
+        return query
+
+    query = union_requests(build_query, lambda columns: (columns.created_at.asc(), columns.id.asc()))
+
+    filename = f"solicitacoes-{campus_code}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(query, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get('/events', status_code=200)
+async def stream_request_events(current_user: dict = Depends(get_current_user)):
+    """
+    Stream Request Events
+
+    Mantém uma conexão Server-Sent Events com as solicitações criadas (`request.created`) e decididas
+    (`request.updated`) no campus do usuário, para que o painel não precise consultar a listagem periodicamente.
+    Se o cliente não acompanhar o ritmo dos eventos, recebe `resync` e a conexão é encerrada: ele deve
+    recarregar a listagem e se conectar novamente.
+    O acesso é restrito para usuários com o papel 'Organizador'.
+
+    **Exemplo de Evento:**
+
+    .. code-block:: text
+
+       event: request.updated
+       data: {"id": "2b7c...", "campus_code": "NAT-CN", "status": "approved", ...}
+    """
+    campus_code = current_user["campus"]
+    groups = current_user["groups"]
+
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para visualizar as solicitações."
+        )
+
+    if request_event_hub.is_full:
+        raise HTTPException(status_code=503, detail="Limite de conexões de eventos atingido. Tente novamente.")
+
+    return StreamingResponse(
+        stream_events(campus_code),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get('/{request_id}',response_model=RequestsResponse, status_code=200)
+async def details_request(request_id: uuid.UUID,
+                          http_response: Response,
+                          if_none_match: Optional[str] = Header(None),
+                          db: AsyncSession = Depends(get_db),
+                          current_user: dict = Depends(get_current_user)) -> RequestsResponse:
     """
     Get Request Details
 
     Busca os detalhes de uma solicitação específica pelo seu ID.
     O acesso é restrito para usuários com o papel 'Organizador'.
+    Assim como na listagem, aceita `If-None-Match` com o `ETag` recebido e responde `304` se nada mudou no campus.
 
     **Exemplo de Resposta:**
 
@@ -120,11 +361,21 @@ def details_request(request_id: uuid.UUID,
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    request = find_by_id(request_id, campus_code, db)
+    version = await get_campus_version(db, campus_code)
+    etag = build_etag(campus_code, version, request_id)
 
-    response = RequestsResponse.model_validate(request)
+    if has_role(groups, "Organizador") and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response = get_cached_request(campus_code, request_id, version)
+
+    if response is None:
+        request = await find_by_id(request_id, campus_code, db)
+        response = RequestsResponse.model_validate(request)
+        cache_request(response, version)
 
     if has_role(groups, "Organizador"):
+        http_response.headers["ETag"] = etag
         return response
 
     else:
@@ -138,14 +389,15 @@ def details_request(request_id: uuid.UUID,
 async def update_request_reason_rejected(request_id: uuid.UUID,
                                          request_in: RequestsPutRequest,
                                          request_object: RequestObject,
-                                         db: Session = Depends(get_db),
+                                         db: AsyncSession = Depends(get_db),
                                          current_user: dict = Depends(get_current_user)):
     """
     Approve or Reject a Request
 
     Aprova ou rejeita uma solicitação pendente. Esta ação é realizada por um 'Organizador'.
-    A rota atualiza o status da solicitação e publica um evento para que o serviço correspondente
-    (ex: serviço de times) execute a ação final (criar time, adicionar membro, etc.).
+    A rota atualiza o status da solicitação e registra, na mesma transação, um evento na outbox para que o
+    serviço correspondente (ex: serviço de times) execute a ação final (criar time, adicionar membro, etc.).
+    O evento é publicado em segundo plano logo após o commit.
 
     - Para rejeitar, o status deve ser `rejected` e o campo `reason_rejected` é obrigatório.
     - Para aprovar, o status deve ser `approved`.
@@ -181,65 +433,36 @@ async def update_request_reason_rejected(request_id: uuid.UUID,
     campus_code = current_user["campus"]
     groups = current_user["groups"]
 
-    request: Request = find_by_id(request_id, campus_code, db)
-
-    if request.status != RequestStatusEnum.pendent:
-        raise Conflict("Conflito")
+    if has_role(groups, "Organizador"):
+        if request_in.status == RequestStatusEnum.pendent:
+            raise Conflict("Conflito")
+        if request_in.reason_rejected and request_in.status != RequestStatusEnum.rejected:
+            raise Conflict("Conflito")
 
-    old_data = model_to_dict(request)
+        decision = RequestDecision(id=request_id, status=request_in.status,
+                                   reason_rejected=request_in.reason_rejected)
 
-    if request_in.status:
-        request.status = request_in.status
+        # Transição condicional em um único UPDATE: só altera se a solicitação ainda estiver pendente
+        updated = await transition_pending_requests(db, campus_code, [decision])
 
-    if request_in.reason_rejected:
-        if request_in.status != RequestStatusEnum.rejected:
+        if not updated:
+            # Consulta extra apenas no caminho de erro, para diferenciar 404 de 409
+            await find_by_id(request_id, campus_code, db)
             raise Conflict("Conflito")
-        request.reason_rejected = request_in.reason_rejected
 
-    if has_role(groups, "Organizador"):
-        db.add(request)
-        db.commit()
-        db.refresh(request)
-
-        log_payload = None
-        event_type = None
-
-        if old_data.get("status") != request.status.value:
-            if request.status == RequestStatusEnum.rejected:
-                event_type = "request.rejected"
-            elif request.status == RequestStatusEnum.approved:
-                event_type = "request.approved"
-
-        if event_type:
-            new_data = model_to_dict(request)
-
-            log_payload = generate_log_payload(
-                event_type=event_type,
-                service_origin="requests_service",
-                entity_type="request",
-                entity_id=request.id,
-                operation_type="UPDATE",
-                campus_code=request.campus_code,
-                user_registration=current_user.get("matricula"),
-                request_object=request_object,
-                old_data=old_data,
-                new_data=new_data
-            )
-
-            run_async_audit(log_payload)
-
-        add_team_request_message_data = {
-            "team_id": str(request.team_id),
-            "campus_code": request.campus_code,
-            "status": request.status.value,
-            "competition_id": str(request.competition_id),
-        }
+        request: Request = updated[0]
 
-        if request.request_type == RequestTypeEnum.approve_team:
-            add_team_request_message_data["request_type"] = RequestTypeEnum.approve_team.value
+        routing_key, add_team_request_message_data = build_request_update_event(request)
+        add_outbox_event(db, routing_key, add_team_request_message_data)
+        await db.commit()
+
+        invalidate_requests(campus_code, [request.id])
+        outbox_relay.notify()
+        request_event_hub.publish(campus_code, EVENT_REQUEST_UPDATED, [request])
 
-            await publish_team_creation_request(add_team_request_message_data)
+        _audit_request_transition(request, current_user, request_object)
 
+        if request.request_type == RequestTypeEnum.approve_team:
             return {
                 "message": "Solicitação para criação de equipe atualizada!",
                 "team_id": request.team_id,
@@ -247,10 +470,6 @@ async def update_request_reason_rejected(request_id: uuid.UUID,
             }
 
         if request.request_type == RequestTypeEnum.delete_team:
-            add_team_request_message_data["request_type"] = RequestTypeEnum.delete_team.value
-
-            await publish_team_remove_request(add_team_request_message_data)
-
             return {
                 "message": "Solicitação para remoção de equipe atualizada!",
                 "team_id": request.team_id,
@@ -258,11 +477,6 @@ async def update_request_reason_rejected(request_id: uuid.UUID,
             }
 
         if request.request_type == RequestTypeEnum.add_team_member:
-            add_team_request_message_data["request_type"] = RequestTypeEnum.add_team_member.value
-            add_team_request_message_data["user_id"] = str(request.user_id)
-
-            await publish_member_add_request(add_team_request_message_data)
-
             return {
                 "message": "Solicitação para adição de membro atualizada!",
                 "team_id": request.team_id,
@@ -271,11 +485,6 @@ async def update_request_reason_rejected(request_id: uuid.UUID,
             }
 
         if request.request_type == RequestTypeEnum.remove_team_member:
-            add_team_request_message_data["request_type"] = RequestTypeEnum.remove_team_member.value
-            add_team_request_message_data["user_id"] = str(request.user_id)
-
-            await publish_member_remove_request(add_team_request_message_data)
-
             return {
                 "message": "Solicitação para remoção de membro atualizada!",
                 "team_id": request.team_id,
@@ -294,10 +503,135 @@ async def update_request_reason_rejected(request_id: uuid.UUID,
         )
 
 
-def find_by_id(request_id: uuid.UUID, campus_code: str, db: Session) -> Request:
+@router.post('/bulk', response_model=RequestsBulkResponse, status_code=200)
+async def bulk_update_requests(requests_in: RequestsBulkPutRequest,
+                               request_object: RequestObject,
+                               db: AsyncSession = Depends(get_db),
+                               current_user: dict = Depends(get_current_user)):
+    """
+    Approve or Reject Requests in Bulk
+
+    Aprova ou rejeita várias solicitações pendentes de uma só vez. Esta ação é realizada por um 'Organizador'.
+    Todas as decisões são aplicadas em uma única transação; apenas solicitações pendentes do campus do
+    usuário são alteradas, e os ids que não puderam ser alterados são retornados em `skipped`.
+    Para cada solicitação alterada, um evento é registrado na outbox e um log de auditoria é enviado.
+
+    - Cada decisão deve ter status `approved` ou `rejected`.
+    - `reason_rejected` só é aceito em decisões com status `rejected`.
+
+    **Exemplo de Corpo da Requisição:**
+
+    .. code-block:: json
+
+       {
+         "decisions": [
+           {"id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6", "status": "approved"},
+           {
+             "id": "b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7",
+             "status": "rejected",
+             "reason_rejected": "A equipe não possui o número mínimo de membros inscritos."
+           }
+         ]
+       }
+
+    **Exemplo de Resposta:**
+
+    .. code-block:: json
+
+       {
+         "updated": [
+           {
+             "id": "a1b2c3d4-e5f6-a7b8-c9d0-e1f2a3b4c5d6",
+             "request_type": "approve_team",
+             "status": "approved",
+             "reason": null,
+             "reason_rejected": null,
+             "campus_code": "NAT-CN",
+             "team_id": "c1d2e3f4-a5b6-b7c8-d9e0-f1a2b3c4d5e6",
+             "user_id": null,
+             "competition_id": "d1e2f3a4-b5c6-d7e8-f9a0-b1c2d3e4f5a6",
+             "created_at": "2025-08-04T21:14:25.123Z"
+           }
+         ],
+         "skipped": ["b2c3d4e5-f6a7-b8c9-d0e1-f2a3b4c5d6e7"]
+       }
+    """
+    campus_code = current_user["campus"]
+    groups = current_user["groups"]
+
+    if not has_role(groups, "Organizador"):
+        raise HTTPException(
+            status_code=403,
+            detail="Você não tem permissão para atualizar solicitações."
+        )
+
+    decisions = requests_in.decisions
+    decision_ids = [decision.id for decision in decisions]
+
+    if len(set(decision_ids)) != len(decision_ids):
+        raise Conflict("Conflito")
+
+    for decision in decisions:
+        if decision.status == RequestStatusEnum.pendent:
+            raise Conflict("Conflito")
+        if decision.reason_rejected and decision.status != RequestStatusEnum.rejected:
+            raise Conflict("Conflito")
+
+    updated = await transition_pending_requests(db, campus_code, decisions)
+
+    for request in updated:
+        routing_key, message_data = build_request_update_event(request)
+        add_outbox_event(db, routing_key, message_data)
+
+    await db.commit()
+
+    if updated:
+        invalidate_requests(campus_code, [request.id for request in updated])
+        outbox_relay.notify()
+        request_event_hub.publish(campus_code, EVENT_REQUEST_UPDATED, updated)
+
+    for request in updated:
+        _audit_request_transition(request, current_user, request_object)
+
+    updated_ids = {request.id for request in updated}
+
+    return {
+        "updated": updated,
+        "skipped": [request_id for request_id in decision_ids if request_id not in updated_ids],
+    }
+
+
+def _audit_request_transition(request: Request, current_user: dict, request_object: RequestObject) -> None:
+    if request.status == RequestStatusEnum.rejected:
+        event_type = "request.rejected"
+    elif request.status == RequestStatusEnum.approved:
+        event_type = "request.approved"
+    else:
+        return
+
+    new_data = model_to_dict(request)
+    # A transição só alcança solicitações pendentes: sem motivo de rejeição e ainda sem data de decisão
+    old_data = {**new_data, "status": RequestStatusEnum.pendent.value, "reason_rejected": None, "decided_at": None}
+
+    log_payload = generate_log_payload(
+        event_type=event_type,
+        service_origin="requests_service",
+        entity_type="request",
+        entity_id=request.id,
+        operation_type="UPDATE",
+        campus_code=request.campus_code,
+        user_registration=current_user.get("matricula"),
+        request_object=request_object,
+        old_data=old_data,
+        new_data=new_data
+    )
+
+    run_async_audit(log_payload)
+
+
+async def find_by_id(request_id: uuid.UUID, campus_code: str, db: AsyncSession) -> Request | ArchivedRequest:
 
-    request: Request = db.query(Request).filter(
-        Request.id == request_id, Request.campus_code == campus_code).first()  # type: ignore
+    request = await find_request(db, request_id, campus_code)
 
     if not request:
         raise NotFound("Solicitação")
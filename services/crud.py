@@ -1,133 +1,333 @@
 import uuid
 from datetime import datetime, timezone
 
-from requests.models.request import Request, RequestStatusEnum, RequestTypeEnum
-from shared.dependencies import get_db
+from sqlalchemy import select, insert, update, case, literal, tuple_, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from requests.models.request import Request, RequestStatusEnum, RequestTypeEnum, RequestDecision
+from requests.models.request_counter import RequestCounter
+from requests.models.campus_version import CampusVersion
+from requests.models.processed_message import ProcessedMessage
+from shared.database import AsyncSessionLocal
+from shared.logger import get_logger
+from services.request_archive import REQUEST_MODELS
+from services.request_events import request_event_hub, EVENT_REQUEST_CREATED
 
-def create_team_request_in_db_sync(message_data: dict) -> dict:
+logger = get_logger("crud")
+
+
+def parse_team_request_message(message_data: dict) -> dict:
     """
-    Função síncrona para criar a TeamRequest no banco de dados.
+    Valida uma mensagem de solicitação sem acessar o banco e devolve os campos já convertidos.
+
+    Para `delete_team`, o `competition_id` fica como None e é resolvido depois a partir da aprovação prévia.
     """
-    db_gen = get_db()
-    db = next(db_gen)
+    team_id_str = message_data.get("team_id")
+    campus_code_str = message_data.get("campus_code")
+    request_type_str = message_data.get("request_type")
+    user_id_str = message_data.get("user_id", None)
+    reason_str = message_data.get("reason")
+
+    if not team_id_str:
+        raise ValueError("'team_id' é obrigatório na mensagem")
+    if not campus_code_str:
+        raise ValueError("'campus_code' é obrigatório na mensagem")
+    if not request_type_str:
+        raise ValueError("'request_type' é obrigatório na mensagem")
 
     try:
-        print(f"DB_SYNC: Criando request para team_id: {message_data.get('team_id')}")
+        current_request_type = RequestTypeEnum(request_type_str)
+    except ValueError:
+        raise ValueError(f"Request type inválido: {request_type_str}")
 
-        team_id_str = message_data.get("team_id")
-        campus_code_str = message_data.get("campus_code")
-        request_type_str = message_data.get("request_type")
-        user_id_str = message_data.get("user_id", None)
-        reason_str = message_data.get("reason")
+    try:
+        team_id_for_db = uuid.UUID(team_id_str)
+    except ValueError:
+        raise ValueError(f"team_id '{team_id_str}' não é um UUID válido")
 
-        if not team_id_str:
-            raise ValueError("'team_id' é obrigatório na mensagem")
-        if not campus_code_str:
-            raise ValueError("'campus_code' é obrigatório na mensagem")
-        if not request_type_str:
-            raise ValueError("'request_type' é obrigatório na mensagem")
+    competition_id_for_db = None
 
-        try:
-            current_request_type = RequestTypeEnum(request_type_str)
-        except ValueError:
-            raise ValueError(f"Request type inválido: {request_type_str}")
+    if current_request_type == RequestTypeEnum.approve_team:
+        competition_id_str = message_data.get("competition_id")
+
+        if not competition_id_str:
+            raise ValueError("'competition_id' é obrigatório para approve_team")
 
         try:
-            team_id_for_db = uuid.UUID(team_id_str)
+            competition_id_for_db = uuid.UUID(competition_id_str)
         except ValueError:
-            raise ValueError(f"team_id '{team_id_str}' não é um UUID válido")
+            raise ValueError(f"competition_id '{competition_id_str}' não é um UUID válido")
 
-        if current_request_type.value == "approve_team":
-            competition_id_str = message_data.get("competition_id")
+    if current_request_type == RequestTypeEnum.remove_team_member and not user_id_str:
+        raise ValueError(
+            f"'user_id' é obrigatório para o tipo de requisição '{current_request_type.value}'")
 
-            if not competition_id_str:
-                raise ValueError("'competition_id' é obrigatório para approve_team")
+    return {
+        "request_type": current_request_type,
+        "team_id": team_id_for_db,
+        "campus_code": campus_code_str,
+        "competition_id": competition_id_for_db,
+        "user_id": user_id_str or None,
+        "reason": reason_str or None,
+        "created_at": datetime.fromisoformat(
+            message_data["created_at"].replace("Z", "+00:00")) if message_data.get("created_at") else datetime.now(timezone.utc)
+    }
 
-            try:
-                competition_id_for_db = uuid.UUID(competition_id_str)
-            except ValueError:
-                raise ValueError(f"competition_id '{competition_id_str}' não é um UUID válido")
 
+def _pending_key(request_type: RequestTypeEnum, team_id: uuid.UUID, campus_code: str, user_id: str | None) -> tuple:
+    # Só a remoção de membro diferencia solicitações pendentes pelo usuário
+    if request_type == RequestTypeEnum.remove_team_member:
+        return request_type, team_id, campus_code, user_id
+    return request_type, team_id, campus_code, None
 
-        elif current_request_type.value == "delete_team":
-            request_competition_id = db.query(Request).filter(
-                Request.team_id == team_id_for_db,
-                Request.campus_code == campus_code_str,
-                Request.request_type == RequestTypeEnum.approve_team,
-                Request.status == RequestStatusEnum.approved
-            ).first()
 
-            if not request_competition_id:
-                raise ValueError("Não foi possível encontrar uma aprovação prévia para esta equipe")
+def select_team_approvals(team_keys: set[tuple]):
+    """
+    SELECT das aprovações de criação das equipes {(team_id, campus_code)}, usado pelas solicitações de
+    delete_team. A aprovação pode já ter sido movida para o arquivo, então as duas tabelas são consultadas.
+    """
+    return union_all(*(
+        select(model.team_id, model.campus_code, model.competition_id).where(
+            tuple_(model.team_id, model.campus_code).in_(team_keys),
+            model.request_type == RequestTypeEnum.approve_team,
+            model.status == RequestStatusEnum.approved
+        )
+        for model in REQUEST_MODELS
+    ))
 
-            competition_id_for_db = request_competition_id.competition_id
 
-        else:
-            competition_id_for_db = None
+def select_pending_requests(team_ids: set[uuid.UUID], campus_codes: set[str]):
+    """
+    SELECT das solicitações pendentes das equipes, usado para descartar mensagens duplicadas.
+    """
+    return select(Request.id, Request.request_type, Request.team_id, Request.campus_code, Request.user_id).where(
+        Request.team_id.in_(team_ids),
+        Request.campus_code.in_(campus_codes),
+        Request.status == RequestStatusEnum.pendent
+    )
+
 
-        print(
-            f"DB_SYNC: Processando request para team_id: {team_id_for_db}, request_type: {current_request_type.value}, user_id: {user_id_str}")
+def _dialect_insert(db: AsyncSession, model):
+    # INSERT com ON CONFLICT, disponível nos dialetos do PostgreSQL e do SQLite (usado nos testes locais)
+    if db.bind.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
 
 
-        filters = [
-            Request.team_id == team_id_for_db,
-            Request.campus_code == campus_code_str,
-            Request.request_type == current_request_type,
-            Request.status == RequestStatusEnum.pendent
-        ]
-
-        if current_request_type == RequestTypeEnum.remove_team_member:
-            if not user_id_str:
-                raise ValueError(
-                    f"'user_id' é obrigatório para o tipo de requisição '{current_request_type.value}'")
-            filters.append(Request.user_id == user_id_str)
-
-        existing_pending_request: Request = db.query(Request).filter(*filters).first()
-
-        if existing_pending_request:
-            print(
-                f"DB_SYNC: Solicitação pendente já existe (ID: {existing_pending_request.id}). Nenhuma nova request será criada.")
-            return {
-                "message": "Solicitação pendente já existente processada como duplicada.",
-                "request_id": existing_pending_request.id,
-                "status": existing_pending_request.status.value
-            }
+async def bump_request_counters(db: AsyncSession, deltas: dict[tuple, int]) -> None:
+    """
+    Soma os deltas {(campus_code, request_type, status): n} em `request_counters` com um único upsert.
+    """
+    # Ordenado para que transações concorrentes bloqueiem as linhas sempre na mesma ordem
+    rows = [
+        {"campus_code": campus_code, "request_type": request_type, "status": status, "count": delta}
+        for (campus_code, request_type, status), delta in sorted(deltas.items()) if delta
+    ]
+
+    if not rows:
+        return
+
+    stmt = _dialect_insert(db, RequestCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RequestCounter.campus_code, RequestCounter.request_type, RequestCounter.status],
+        set_={"count": RequestCounter.count + stmt.excluded.count}
+    )
+    await db.execute(stmt)
+
+
+async def bump_campus_versions(db: AsyncSession, campus_codes: set[str]) -> None:
+    """
+    Incrementa a versão dos campi em `campus_versions` com um único upsert, sem fazer commit.
+    """
+    rows = [{"campus_code": campus_code, "version": 1} for campus_code in sorted(campus_codes)]
+
+    if not rows:
+        return
+
+    stmt = _dialect_insert(db, CampusVersion).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CampusVersion.campus_code],
+        set_={"version": CampusVersion.version + 1}
+    )
+    await db.execute(stmt)
+
+
+async def record_processed_messages(db: AsyncSession, message_keys: set[str]) -> None:
+    """
+    Registra as mensagens em `processed_messages`, sem fazer commit. Chaves já registradas são ignoradas.
+    """
+    if not message_keys:
+        return
+
+    stmt = _dialect_insert(db, ProcessedMessage).values([{"message_key": key} for key in sorted(message_keys)])
+    await db.execute(stmt.on_conflict_do_nothing(index_elements=[ProcessedMessage.message_key]))
+
+
+async def create_team_request_in_db(message_data: dict, message_key: str | None = None) -> dict:
+    """
+    Função assíncrona para criar a TeamRequest no banco de dados.
+    """
+    result = (await create_team_requests_in_db_batch([message_data], [message_key]))[0]
 
-        print(f"DB_SYNC: Criando nova request...")
+    if isinstance(result, Exception):
+        raise result
 
-        request_creation_data = {
-            "request_type": current_request_type,
-            "team_id": team_id_for_db,
-            "campus_code": campus_code_str,
-            "status": RequestStatusEnum.pendent,
-            "created_at": datetime.fromisoformat(
-                message_data["created_at"].replace("Z", "+00:00")) if message_data.get("created_at") else datetime.now(timezone.utc)
-        }
+    return result
 
-        if competition_id_for_db is not None:
-            request_creation_data["competition_id"] = competition_id_for_db
 
-        if user_id_str:
-            request_creation_data["user_id"] = user_id_str
+async def create_team_requests_in_db_batch(messages_data: list[dict],
+                                           message_keys: list[str | None] | None = None) -> list:
+    """
+    Cria as TeamRequests de um lote de mensagens em uma única transação.
 
-        if reason_str:
-            request_creation_data["reason"] = reason_str
+    Retorna, na ordem das mensagens, o resultado de cada uma ou o ValueError que impediu sua gravação.
+    Erros de banco desfazem o lote inteiro e são propagados. Com `message_keys`, as mensagens gravadas
+    (inclusive as duplicadas de pendentes) são registradas em `processed_messages` na mesma transação.
+    """
+    results: list = [None] * len(messages_data)
+    parsed: dict[int, dict] = {}
 
-        new_request = Request(**request_creation_data)
+    for index, message_data in enumerate(messages_data):
+        try:
+            parsed[index] = parse_team_request_message(message_data)
+        except ValueError as e:
+            logger.warning("Mensagem inválida: %s", e, extra={"team_id": message_data.get("team_id")})
+            results[index] = e
 
-        db.add(new_request)
-        db.commit()
-        db.refresh(new_request)
+    if not parsed:
+        return results
 
-        print(f"DB_SYNC: Request ID {new_request.id} criada com sucesso para team_id: {new_request.team_id}")
-        return {"request_id": new_request.id, "status": new_request.status.value}
-    except Exception as e:
-        db.rollback()
-        print(f"DB_SYNC: Erro ao criar request no banco: {e}")
-        raise
-    finally:
+    async with AsyncSessionLocal() as db:
         try:
-            next(db_gen)
-        except StopIteration:
-            pass
\ No newline at end of file
+            delete_team_keys = {
+                (data["team_id"], data["campus_code"])
+                for data in parsed.values() if data["request_type"] == RequestTypeEnum.delete_team
+            }
+
+            if delete_team_keys:
+                approvals_result = await db.execute(select_team_approvals(delete_team_keys))
+                approvals = {(row.team_id, row.campus_code): row.competition_id for row in approvals_result}
+
+                for index, data in list(parsed.items()):
+                    if data["request_type"] != RequestTypeEnum.delete_team:
+                        continue
+
+                    approval_key = (data["team_id"], data["campus_code"])
+                    if approval_key not in approvals:
+                        results[index] = ValueError("Não foi possível encontrar uma aprovação prévia para esta equipe")
+                        del parsed[index]
+                        continue
+
+                    data["competition_id"] = approvals[approval_key]
+
+            if not parsed:
+                return results
+
+            pending_result = await db.execute(select_pending_requests(
+                {data["team_id"] for data in parsed.values()},
+                {data["campus_code"] for data in parsed.values()}
+            ))
+            pending_ids = {}
+            for row in pending_result:
+                pending_ids.setdefault(
+                    _pending_key(row.request_type, row.team_id, row.campus_code, row.user_id), row.id)
+
+            new_rows = []
+            for index, data in parsed.items():
+                key = _pending_key(data["request_type"], data["team_id"], data["campus_code"], data["user_id"])
+
+                if key in pending_ids:
+                    logger.info("Solicitação pendente já existe. Nenhuma nova request será criada.",
+                                extra={"request_id": str(pending_ids[key])})
+                    results[index] = {
+                        "message": "Solicitação pendente já existente processada como duplicada.",
+                        "request_id": pending_ids[key],
+                        "status": RequestStatusEnum.pendent.value
+                    }
+                    continue
+
+                # Mensagens repetidas dentro do próprio lote também são tratadas como duplicadas
+                new_id = uuid.uuid4()
+                pending_ids[key] = new_id
+                new_rows.append({**data, "id": new_id, "status": RequestStatusEnum.pendent})
+                results[index] = {"request_id": new_id, "status": RequestStatusEnum.pendent.value}
+
+            if new_rows:
+                await db.execute(insert(Request), new_rows)
+
+                counter_deltas: dict[tuple, int] = {}
+                for row in new_rows:
+                    key = (row["campus_code"], row["request_type"], RequestStatusEnum.pendent)
+                    counter_deltas[key] = counter_deltas.get(key, 0) + 1
+                await bump_request_counters(db, counter_deltas)
+                await bump_campus_versions(db, {row["campus_code"] for row in new_rows})
+
+            if message_keys:
+                await record_processed_messages(db, {
+                    message_keys[index] for index in parsed if message_keys[index]
+                })
+
+            await db.commit()
+
+            created_by_campus: dict[str, list[dict]] = {}
+            for row in new_rows:
+                created_by_campus.setdefault(row["campus_code"], []).append(row)
+            for campus_code, rows in created_by_campus.items():
+                request_event_hub.publish(campus_code, EVENT_REQUEST_CREATED, rows)
+
+            logger.debug("Lote de %d mensagens processado, %d requests criadas.", len(messages_data), len(new_rows))
+            return results
+        except Exception as e:
+            await db.rollback()
+            logger.error("Erro ao criar requests no banco: %s", e)
+            raise
+
+
+async def transition_pending_requests(db: AsyncSession, campus_code: str,
+                                      decisions: list[RequestDecision]) -> list[Request]:
+    """
+    Aplica as decisões em um único UPDATE ... RETURNING, restrito ao campus e a solicitações pendentes.
+
+    Retorna apenas as solicitações que mudaram de estado, com `decided_at` preenchido; ids inexistentes, de
+    outro campus ou já decididos ficam de fora. Atualiza `request_counters` e `campus_versions` na mesma transação, mas não faz commit.
+    """
+    status_by_id = {decision.id: literal(decision.status, Request.status.type) for decision in decisions}
+    reason_by_id = {
+        decision.id: literal(decision.reason_rejected, Request.reason_rejected.type)
+        for decision in decisions if decision.reason_rejected
+    }
+
+    new_reason_rejected = Request.reason_rejected
+    if reason_by_id:
+        new_reason_rejected = case(reason_by_id, value=Request.id, else_=Request.reason_rejected)
+
+    result = await db.execute(
+        update(Request)
+        .where(
+            Request.id.in_(status_by_id.keys()),
+            Request.campus_code == campus_code,
+            Request.status == RequestStatusEnum.pendent
+        )
+        .values(
+            status=case(status_by_id, value=Request.id, else_=Request.status),
+            reason_rejected=new_reason_rejected,
+            decided_at=datetime.now(timezone.utc)
+        )
+        .returning(Request)
+        .execution_options(synchronize_session=False)
+    )
+    updated = list(result.scalars().all())
+
+    counter_deltas: dict[tuple, int] = {}
+    for request in updated:
+        old_key = (request.campus_code, request.request_type, RequestStatusEnum.pendent)
+        new_key = (request.campus_code, request.request_type, request.status)
+        counter_deltas[old_key] = counter_deltas.get(old_key, 0) - 1
+        counter_deltas[new_key] = counter_deltas.get(new_key, 0) + 1
+    await bump_request_counters(db, counter_deltas)
+
+    if updated:
+        await bump_campus_versions(db, {campus_code})
+
+    return updated
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import Select, select, delete, insert, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from requests.models.request import Request, ArchivedRequest, RequestStatusEnum, REQUEST_FIELDS
+from shared.database import AsyncSessionLocal
+from shared.logger import get_logger
+
+# Com "false", esta instância não move solicitações; as leituras continuam cobrindo as duas tabelas
+REQUESTS_ARCHIVE_ENABLED = os.getenv("REQUESTS_ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+REQUESTS_ARCHIVE_AFTER_DAYS = float(os.getenv("REQUESTS_ARCHIVE_AFTER_DAYS", "30"))
+REQUESTS_ARCHIVE_BATCH_SIZE = int(os.getenv("REQUESTS_ARCHIVE_BATCH_SIZE", "500"))
+REQUESTS_ARCHIVE_INTERVAL = float(os.getenv("REQUESTS_ARCHIVE_INTERVAL_SECONDS", "300"))
+REQUESTS_ARCHIVE_RETRY_DELAY = 30
+
+REQUEST_MODELS = (Request, ArchivedRequest)
+
+logger = get_logger("archive")
+
+
+def union_requests(build: Callable[[type], Select], order_by: Callable, limit: int | None = None) -> Select:
+    """
+    Monta a mesma consulta sobre `requests` e `requests_archive` e junta os resultados com UNION ALL.
+
+    `build(model)` devolve o SELECT filtrado de uma tabela e `order_by(columns)` a ordenação, aplicada às
+    colunas de cada tabela e do resultado combinado. Com `limit`, cada tabela já é limitada antes da junção.
+    """
+    branches = []
+    for model in REQUEST_MODELS:
+        branch = build(model)
+        if limit is not None:
+            # Subconsulta para que ORDER BY/LIMIT por tabela também funcione no SQLite
+            branch = select(branch.order_by(*order_by(model)).limit(limit).subquery())
+        branches.append(branch)
+
+    combined = union_all(*branches).subquery()
+    query = select(combined).order_by(*order_by(combined.c))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+async def find_request(db: AsyncSession, request_id: uuid.UUID, campus_code: str) -> Request | ArchivedRequest | None:
+    """
+    Busca a solicitação primeiro entre as recentes e, se não estiver lá, no arquivo.
+    """
+    for model in REQUEST_MODELS:
+        result = await db.execute(select(model).where(model.id == request_id, model.campus_code == campus_code))
+        request = result.scalars().first()
+        if request is not None:
+            return request
+    return None
+
+
+class RequestArchiver:
+    """
+    Tarefa de fundo que move solicitações decididas há mais de `archive_after_days` dias (por `decided_at`)
+    de `requests` para `requests_archive`, mantendo a tabela principal restrita às pendentes e às decididas
+    recentemente.
+
+    Cada lote é movido em uma única transação (DELETE ... RETURNING seguido do INSERT no arquivo), com
+    `FOR UPDATE SKIP LOCKED` para que várias instâncias da API rodem o arquivador ao mesmo tempo.
+    """
+
+    def __init__(self, batch_size: int = REQUESTS_ARCHIVE_BATCH_SIZE,
+                 archive_after_days: float = REQUESTS_ARCHIVE_AFTER_DAYS,
+                 interval: float = REQUESTS_ARCHIVE_INTERVAL):
+        self.batch_size = batch_size
+        self.archive_after_days = archive_after_days
+        self.interval = interval
+
+        self._task: asyncio.Task | None = None
+
+        self.archived = 0
+        self.failures = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def metrics(self) -> dict:
+        return {
+            "running": self.is_running,
+            "archived": self.archived,
+            "failures": self.failures,
+        }
+
+    async def archive_batch(self) -> int:
+        """
+        Move um lote de solicitações decididas e retorna quantas foram movidas.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.archive_after_days)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Request.id)
+                .where(Request.status != RequestStatusEnum.pendent, Request.decided_at < cutoff)
+                .order_by(Request.decided_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            request_ids = result.scalars().all()
+
+            if not request_ids:
+                return 0
+
+            result = await db.execute(
+                delete(Request)
+                .where(Request.id.in_(request_ids))
+                .returning(*(getattr(Request, field) for field in REQUEST_FIELDS), Request.decided_at)
+                .execution_options(synchronize_session=False)
+            )
+            archived_at = datetime.now(timezone.utc)
+            rows = [{**row._asdict(), "archived_at": archived_at} for row in result]
+
+            await db.execute(insert(ArchivedRequest), rows)
+            await db.commit()
+
+            self.archived += len(rows)
+            logger.debug("%d solicitações movidas para o arquivo", len(rows))
+            return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                archived = await self.archive_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error("Falha ao arquivar solicitações: %s. Tentando novamente em %d segundos...",
+                             e, REQUESTS_ARCHIVE_RETRY_DELAY)
+                await asyncio.sleep(REQUESTS_ARCHIVE_RETRY_DELAY)
+                continue
+
+            # Lote cheio indica que ainda há solicitações a mover; segue sem esperar o intervalo
+            if archived >= self.batch_size:
+                await asyncio.sleep(0)
+                continue
+
+            await asyncio.sleep(self.interval)
+
+
+request_archiver = RequestArchiver()
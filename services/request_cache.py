@@ -0,0 +1,43 @@
+import os
+import uuid
+
+from requests.models.request import RequestsResponse, RequestStatusEnum
+from shared.cache import LRUCache
+from shared.metrics import REQUEST_CACHE_HITS, REQUEST_CACHE_MISSES
+
+REQUEST_CACHE_SIZE = int(os.getenv("REQUEST_CACHE_SIZE", "10000"))
+REQUEST_CACHE_TTL_DECIDED = float(os.getenv("REQUEST_CACHE_TTL_DECIDED_SECONDS", "300"))
+REQUEST_CACHE_TTL_PENDING = float(os.getenv("REQUEST_CACHE_TTL_PENDING_SECONDS", "5"))
+
+# Detalhes de solicitações indexados por (campus_code, id). Solicitações decididas não mudam mais e
+# ficam mais tempo; pendentes expiram rápido porque podem ser decididas por outra instância da API.
+request_cache = LRUCache(REQUEST_CACHE_SIZE)
+
+
+def get_cached_request(campus_code: str, request_id: uuid.UUID, version: int) -> RequestsResponse | None:
+    """
+    Solicitações pendentes só valem se foram lidas na versão atual do campus, já que podem ter sido
+    decididas por outra instância da API; decididas não mudam mais.
+    """
+    item = request_cache.get((campus_code, request_id))
+    if item is None:
+        REQUEST_CACHE_MISSES.inc()
+        return None
+
+    cached_version, response = item
+    if response.status == RequestStatusEnum.pendent and cached_version != version:
+        REQUEST_CACHE_MISSES.inc()
+        return None
+
+    REQUEST_CACHE_HITS.inc()
+    return response
+
+
+def cache_request(response: RequestsResponse, version: int) -> None:
+    ttl = REQUEST_CACHE_TTL_PENDING if response.status == RequestStatusEnum.pendent else REQUEST_CACHE_TTL_DECIDED
+    request_cache.set((response.campus_code, response.id), (version, response), ttl=ttl)
+
+
+def invalidate_requests(campus_code: str, request_ids) -> None:
+    for request_id in request_ids:
+        request_cache.delete((campus_code, request_id))
@@ -0,0 +1,197 @@
+import asyncio
+import os
+from typing import AsyncIterator, Callable
+
+from requests.models.request import Request, REQUEST_FIELDS
+from shared.logger import get_logger
+from shared.responses import dumps_json
+
+REQUEST_EVENTS_BUFFER_SIZE = int(os.getenv("REQUEST_EVENTS_BUFFER_SIZE", "100"))
+REQUEST_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("REQUEST_EVENTS_MAX_SUBSCRIBERS", "1000"))
+REQUEST_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("REQUEST_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+EVENT_REQUEST_CREATED = "request.created"
+EVENT_REQUEST_UPDATED = "request.updated"
+EVENT_RESYNC = "resync"
+
+logger = get_logger("request_events")
+
+
+def request_event_data(request: Request | dict) -> dict:
+    if isinstance(request, dict):
+        return {field: request.get(field) for field in REQUEST_FIELDS}
+    return {field: getattr(request, field) for field in REQUEST_FIELDS}
+
+
+class Subscription:
+    """
+    Assinatura de um cliente: uma fila limitada de eventos de um campus.
+    """
+
+    def __init__(self, campus_code: str, buffer_size: int):
+        self.campus_code = campus_code
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def offer(self, event: tuple[str, dict]) -> bool:
+        """
+        Entrega o evento sem bloquear. Com o buffer cheio, descarta os eventos pendentes e deixa apenas
+        um aviso de `resync`: o cliente deve recarregar a listagem em vez de receber um fluxo incompleto.
+        """
+        if self.overflowed:
+            return False
+
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.resync()
+            return False
+
+    def resync(self) -> None:
+        """
+        Descarta os eventos pendentes e deixa apenas o aviso de `resync`; o stream termina depois dele.
+        """
+        if self.overflowed:
+            return
+
+        self.overflowed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait((EVENT_RESYNC, {"campus_code": self.campus_code}))
+
+
+class RequestEventHub:
+    """
+    Distribui os eventos de solicitações criadas e decididas para os clientes conectados ao stream do
+    respectivo campus.
+
+    `publish` entrega os eventos gerados neste processo e os repassa ao `forwarder` configurado (o
+    `RequestEventBroadcaster`), que os envia aos demais processos; os eventos vindos de outros processos
+    chegam por `deliver`. Assim, o stream recebe as criações feitas pelos workers do consumidor
+    (RUN_CONSUMER_IN_API=false) e as decisões tomadas em outros workers da API.
+    """
+
+    def __init__(self, buffer_size: int = REQUEST_EVENTS_BUFFER_SIZE,
+                 max_subscribers: int = REQUEST_EVENTS_MAX_SUBSCRIBERS):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._count = 0
+        self._forwarder: Callable[[str, str, list[dict]], None] | None = None
+
+        self.published = 0
+        self.overflows = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self._count >= self.max_subscribers
+
+    def subscribe(self, campus_code: str) -> Subscription | None:
+        if self.is_full:
+            return None
+
+        subscription = Subscription(campus_code, self.buffer_size)
+        self._subscriptions.setdefault(campus_code, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.campus_code)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+
+        subscriptions.discard(subscription)
+        self._count -= 1
+        if not subscriptions:
+            del self._subscriptions[subscription.campus_code]
+
+    def set_forwarder(self, forwarder: Callable[[str, str, list[dict]], None] | None) -> None:
+        self._forwarder = forwarder
+
+    def publish(self, campus_code: str, event_type: str, requests: list) -> None:
+        """
+        Publica eventos gerados neste processo: entrega aos clientes locais e repassa aos demais processos.
+        """
+        if not requests:
+            return
+
+        events = [request_event_data(request) for request in requests]
+        self.deliver(campus_code, event_type, events)
+        if self._forwarder is not None:
+            self._forwarder(campus_code, event_type, events)
+
+    def deliver(self, campus_code: str, event_type: str, events: list[dict]) -> None:
+        """
+        Entrega eventos já serializados aos clientes conectados a este processo.
+        """
+        subscriptions = self._subscriptions.get(campus_code)
+        if not subscriptions:
+            return
+
+        for data in events:
+            event = (event_type, data)
+            for subscription in list(subscriptions):
+                if subscription.overflowed:
+                    continue
+                if not subscription.offer(event):
+                    self.overflows += 1
+                    logger.warning("Buffer de eventos cheio, cliente será ressincronizado",
+                                   extra={"campus_code": campus_code})
+            self.published += 1
+
+    def resync_all(self) -> None:
+        """
+        Pede a todos os clientes que recarreguem a listagem, quando eventos de outros processos podem ter se perdido.
+        """
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                subscription.resync()
+
+    def metrics(self) -> dict:
+        return {
+            "subscribers": self._count,
+            "campuses": len(self._subscriptions),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+
+request_event_hub = RequestEventHub()
+
+
+def format_sse(event_type: str, data: dict) -> bytes:
+    return b"event: " + event_type.encode() + b"\ndata: " + dumps_json(data) + b"\n\n"
+
+
+async def stream_events(campus_code: str,
+                        heartbeat: float = REQUEST_EVENTS_HEARTBEAT_SECONDS) -> AsyncIterator[bytes]:
+    """
+    Gera o stream SSE do campus, com comentários periódicos para manter a conexão aberta.
+
+    A assinatura é feita aqui, e não no endpoint: se o cliente desconectar antes de o corpo começar a ser
+    enviado, o gerador nunca roda e não sobra assinatura sem dono.
+    """
+    subscription = request_event_hub.subscribe(campus_code)
+    if subscription is None:
+        # O limite foi atingido entre a verificação no endpoint e o início do stream
+        yield format_sse(EVENT_RESYNC, {"campus_code": campus_code})
+        return
+
+    try:
+        yield b"retry: 3000\n\n"
+
+        while True:
+            try:
+                event_type, data = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield b": heartbeat\n\n"
+                continue
+
+            yield format_sse(event_type, data)
+
+            if event_type == EVENT_RESYNC:
+                return
+    finally:
+        request_event_hub.unsubscribe(subscription)
@@ -0,0 +1,71 @@
+import csv
+import io
+import os
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator
+
+from sqlalchemy import Select
+
+from requests.models.request import RequestExportFormatEnum
+from shared.database import AsyncSessionLocal
+from shared.logger import get_logger
+from shared.responses import dumps_json
+
+REQUESTS_EXPORT_CHUNK_SIZE = int(os.getenv("REQUESTS_EXPORT_CHUNK_SIZE", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    RequestExportFormatEnum.ndjson: "application/x-ndjson",
+    RequestExportFormatEnum.csv: "text/csv; charset=utf-8",
+}
+
+logger = get_logger("export")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_ndjson(rows) -> bytes:
+    return b"".join(dumps_json(row._asdict()) + b"\n" for row in rows)
+
+
+def _encode_csv(rows, header: list[str] | None = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_export(query: Select, export_format: RequestExportFormatEnum,
+                        chunk_size: int = REQUESTS_EXPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Percorre o resultado da consulta com um cursor no servidor, `chunk_size` linhas por vez, e devolve
+    cada bloco já serializado. A memória usada não depende da quantidade de linhas exportadas.
+
+    Abre a própria sessão: a sessão da requisição é fechada antes de o corpo da resposta ser enviado.
+    """
+    exported = 0
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+
+        if export_format == RequestExportFormatEnum.csv:
+            yield _encode_csv([], header=list(result.keys()))
+
+        async for rows in result.partitions():
+            if export_format == RequestExportFormatEnum.csv:
+                yield _encode_csv(rows)
+            else:
+                yield _encode_ndjson(rows)
+            exported += len(rows)
+
+    logger.info("Exportação concluída", extra={"rows": exported, "format": export_format.value})
@@ -0,0 +1,34 @@
+import hashlib
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from requests.models.campus_version import CampusVersion
+
+
+async def get_campus_version(db: AsyncSession, campus_code: str) -> int:
+    """
+    Lê a versão atual das solicitações do campus; campi sem solicitações estão na versão 0.
+    """
+    version = await db.scalar(select(CampusVersion.version).where(CampusVersion.campus_code == campus_code))
+    return version or 0
+
+
+def build_etag(campus_code: str, version: int, *parts) -> str:
+    """
+    ETag fraco derivado da versão do campus e do que distingue a resposta (filtros, cursor, id).
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in (campus_code, *parts)).encode()).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # A comparação de If-None-Match é fraca: ignora o prefixo W/
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
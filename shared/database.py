@@ -1,18 +1,56 @@
-from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
 from dotenv import load_dotenv
 import os
 
+from shared.metrics import InstrumentedAsyncQueuePool, instrument_engine
+
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Troca o driver síncrono da URL (usado pelo Alembic) pelo driver assíncrono equivalente.
+    """
+    url_obj = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url_obj.drivername, url_obj.drivername)
+    return url_obj.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+SQLALCHEMY_ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+engine_options = {}
+if not SQLALCHEMY_ASYNC_DATABASE_URL.startswith("sqlite"):
+    engine_options = {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
+
+engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    **engine_options
 )
+instrument_engine(engine.sync_engine)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -0,0 +1,157 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+
+ROOT_LOGGER_NAME = "requests_service"
+
+# Atributos padrão de um LogRecord; o restante veio de `extra=` e vira campo estruturado
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata cada registro como uma linha JSON, incluindo os campos passados em `extra=`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extra_fields(record),
+        }
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Formato legível para desenvolvimento: os campos estruturados vão ao final como `chave=valor`.
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-8s [%(name)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enfileira os registros sem bloquear o chamador; com a fila cheia, o registro é descartado e contado.
+
+    A formatação fica para a thread de escrita, então o caminho quente só monta o LogRecord.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve a mensagem agora para que argumentos mutáveis não mudem antes da escrita
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler: DroppingQueueHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging() -> None:
+    """
+    Liga os loggers do serviço a uma fila em memória esvaziada por uma thread que escreve no stdout.
+    """
+    global _queue_handler, _listener
+
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE))
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler)
+
+    root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+    root_logger.setLevel(LOG_LEVEL)
+    root_logger.addHandler(_queue_handler)
+    root_logger.propagate = False
+
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Escreve os registros ainda na fila, encerra a thread de escrita e desliga a fila do logger raiz.
+
+    Sem remover o handler, um `configure_logging` posterior acrescentaria outra fila e cada registro
+    sairia duplicado; registros emitidos depois do encerramento seguem para o tratamento padrão do Python.
+    """
+    global _queue_handler, _listener
+
+    if _listener is None:
+        return
+
+    root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+    root_logger.removeHandler(_queue_handler)
+    root_logger.propagate = True
+
+    _listener.stop()
+    _listener = None
+    _queue_handler = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def sample_payload(payload: Any) -> Any:
+    """
+    Devolve o payload para ser incluído no log apenas em uma fração `LOG_PAYLOAD_SAMPLE_RATE` das chamadas.
+    """
+    if LOG_PAYLOAD_SAMPLE_RATE >= 1 or random.random() < LOG_PAYLOAD_SAMPLE_RATE:
+        return payload
+    return None
+
+
+def logging_metrics() -> dict:
+    if _queue_handler is None:
+        return {"queue_depth": 0, "dropped": 0}
+
+    return {
+        "queue_depth": _queue_handler.queue.qsize(),
+        "dropped": _queue_handler.dropped,
+    }
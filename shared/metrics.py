@@ -0,0 +1,147 @@
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+HTTP_REQUEST_DURATION = Histogram(
+    "requests_service_http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status_code"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "requests_service_db_query_duration_seconds",
+    "Tempo de execução das consultas SQL por tipo de comando",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "requests_service_db_pool_checkout_wait_seconds",
+    "Tempo de espera para obter uma conexão do pool do banco",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+
+CONSUMER_MESSAGES = Counter(
+    "requests_service_consumer_messages_total",
+    "Mensagens processadas pelo consumidor por fila e resultado",
+    ["queue", "outcome"],
+)
+
+CONSUMER_PROCESSING_DURATION = Histogram(
+    "requests_service_consumer_processing_duration_seconds",
+    "Tempo de processamento de cada mensagem do consumidor por fila",
+    ["queue"],
+)
+
+PUBLISH_DURATION = Histogram(
+    "requests_service_publish_duration_seconds",
+    "Latência de publicação no RabbitMQ (incluindo a confirmação do broker) por routing key",
+    ["routing_key"],
+)
+
+AUDIT_QUEUE_DEPTH = Gauge(
+    "requests_service_audit_queue_depth",
+    "Logs de auditoria aguardando envio",
+)
+
+AUDIT_DROPPED = Counter(
+    "requests_service_audit_dropped_total",
+    "Logs de auditoria descartados",
+)
+
+REQUEST_CACHE_HITS = Counter(
+    "requests_service_request_cache_hits_total",
+    "Detalhes de solicitações servidos pelo cache",
+)
+
+REQUEST_CACHE_MISSES = Counter(
+    "requests_service_request_cache_misses_total",
+    "Detalhes de solicitações buscados no banco (ausentes no cache ou pendentes de uma versão anterior)",
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra a latência de cada requisição HTTP pelo template da rota,
+    e não pelo caminho real, para não criar uma série por id de solicitação.
+
+    Respostas em stream (eventos SSE, exportação) registram só o tempo até o primeiro trecho do corpo:
+    a duração total depende de quanto tempo o cliente fica conectado e distorceria os buckets.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        observed = False
+
+        def observe() -> None:
+            nonlocal observed
+            observed = True
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=route.path if route is not None else "unmatched",
+                status_code=str(status_code),
+            ).observe(time.perf_counter() - start)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and message.get("more_body") and not observed:
+                observe()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not observed:
+                observe()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool de conexões que mede quanto tempo cada checkout esperou por uma conexão livre.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Registra a duração de cada comando SQL executado pelo engine (síncrono, ou `async_engine.sync_engine`).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start_time"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_QUERY_DURATION.labels(operation=operation).observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        if context.connection is not None and context.connection.info.get("query_start_time"):
+            context.connection.info["query_start_time"].pop()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,26 @@
+import base64
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, request_id: uuid.UUID) -> str:
+    """
+    Gera um cursor opaco a partir da chave de ordenação (created_at, id) do último item da página.
+    """
+    raw = f"{created_at.isoformat()}|{request_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Converte um cursor gerado por `encode_cursor` de volta para (created_at, id).
+
+    Levanta ValueError se o cursor estiver malformado.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        created_at_str, request_id_str = raw.split("|", 1)
+        return datetime.fromisoformat(created_at_str), uuid.UUID(request_id_str)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
@@ -0,0 +1,30 @@
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Serializa com orjson, quando disponível, aceitando UUID, datetime e Enum diretamente
+    (datetimes em UTC saem com "Z", como no Pydantic).
+    """
+    if orjson is None:
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada com `dumps_json`, de forma que linhas do banco podem ser devolvidas
+    sem passar por modelos Pydantic.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
@@ -0,0 +1,63 @@
+"""
+Configuração comum dos testes que rodam sobre um SQLite temporário (aiosqlite), sem PostgreSQL nem RabbitMQ.
+
+As variáveis de ambiente são definidas antes de qualquer import do serviço, pois o engine e a chave do JWT
+são lidos na importação dos módulos.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+TEST_DATABASE_DIR = tempfile.mkdtemp(prefix="requests_tests_")
+atexit.register(shutil.rmtree, TEST_DATABASE_DIR, ignore_errors=True)
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DATABASE_DIR, 'requests.db')}"
+os.environ["JWT_SECRET_KEY"] = "test-secret"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from jose import jwt  # noqa: E402
+
+import requests.models.campus_version  # noqa: E402,F401
+import requests.models.outbox_event  # noqa: E402,F401
+import requests.models.processed_message  # noqa: E402,F401
+import requests.models.request_counter  # noqa: E402,F401
+from shared.database import Base, engine  # noqa: E402
+
+CAMPUS_CODE = "C1"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def database():
+    """
+    Recria todas as tabelas antes de cada teste.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    # As conexões do pool ficam presas ao event loop do teste
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(database):
+    from main import app
+
+    # Sem o lifespan: relay da outbox, consumidor e pipeline de auditoria não são iniciados
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode({"matricula": "20230000", "campus": CAMPUS_CODE, "groups": ["Organizador"]},
+                       os.environ["JWT_SECRET_KEY"], algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,120 @@
+"""
+Descarte de reentregas no consumidor, com mensagens em memória no lugar das do aio-pika.
+"""
+import contextlib
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from messaging import consumers
+from messaging.processed_messages import processed_messages
+from requests.models.request import Request, RequestDecision, RequestStatusEnum
+from services.crud import transition_pending_requests
+from shared.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeMessage:
+    """
+    Mensagem com a parte da interface de `aio_pika.IncomingMessage` usada pelo consumidor.
+    """
+
+    def __init__(self, body: dict, message_id: str | None = None, redelivered: bool = False):
+        self.routing_key = consumers.ROUTING_KEY_TEAM_CREATION
+        self.body = json.dumps(body).encode()
+        self.message_id = message_id
+        self.redelivered = redelivered
+        self.headers = {}
+        self.outcome: str | None = None
+
+    @property
+    def processed(self) -> bool:
+        return self.outcome is not None
+
+    async def ack(self, **kwargs) -> None:
+        self.outcome = "acked"
+
+    async def reject(self, requeue: bool = False) -> None:
+        self.outcome = "rejected"
+
+    @contextlib.asynccontextmanager
+    async def process(self, requeue: bool = False, **kwargs):
+        try:
+            yield self
+        except Exception:
+            await self.reject(requeue=requeue)
+            raise
+        else:
+            await self.ack()
+
+
+def approve_team_body() -> dict:
+    return {
+        "team_id": str(uuid.uuid4()),
+        "campus_code": "C1",
+        "request_type": "approve_team",
+        "competition_id": str(uuid.uuid4()),
+    }
+
+
+async def requests_by_status() -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Request.status, func.count()).group_by(Request.status))
+        return dict(result.all())
+
+
+async def decide_all() -> None:
+    async with AsyncSessionLocal() as db:
+        ids = (await db.execute(select(Request.id))).scalars().all()
+        await transition_pending_requests(
+            db, "C1", [RequestDecision(id=request_id, status=RequestStatusEnum.approved) for request_id in ids])
+        await db.commit()
+
+
+async def test_redelivery_of_processed_message_is_skipped(database):
+    body = approve_team_body()
+    message_id = str(uuid.uuid4())
+
+    first = FakeMessage(body, message_id=message_id)
+    await consumers.process_message(first)
+    # Decidida, a solicitação deixa de barrar uma nova pendente: só o registro da mensagem evita a cópia
+    await decide_all()
+
+    skipped = processed_messages.skipped
+    redelivery = FakeMessage(body, message_id=message_id, redelivered=True)
+    await consumers.process_message(redelivery)
+
+    assert first.outcome == redelivery.outcome == "acked"
+    assert processed_messages.skipped == skipped + 1
+    assert await requests_by_status() == {RequestStatusEnum.approved: 1}
+
+
+async def test_first_delivery_with_same_key_is_processed(database):
+    # Reenvio do produtor sem message_id: mesma chave da mensagem anterior, mas não é uma reentrega
+    body = approve_team_body()
+    await consumers.process_message(FakeMessage(body))
+    await decide_all()
+
+    resubmission = FakeMessage(body)
+    await consumers.process_message(resubmission)
+
+    assert resubmission.outcome == "acked"
+    assert await requests_by_status() == {RequestStatusEnum.approved: 1, RequestStatusEnum.pendent: 1}
+
+
+async def test_batch_dedupes_redeliveries_and_repeated_messages(database):
+    body = approve_team_body()
+    message_id = str(uuid.uuid4())
+    await consumers.process_batch([FakeMessage(body, message_id=message_id)])
+    await decide_all()
+
+    redelivery = FakeMessage(body, message_id=message_id, redelivered=True)
+    repeated = [FakeMessage(approve_team_body()) for _ in range(2)]
+    repeated.append(FakeMessage(json.loads(repeated[0].body)))
+    await consumers.process_batch([redelivery, *repeated])
+
+    assert all(message.outcome == "acked" for message in [redelivery, *repeated])
+    assert await requests_by_status() == {RequestStatusEnum.approved: 1, RequestStatusEnum.pendent: 2}
@@ -0,0 +1,133 @@
+"""
+Criação e decisão de solicitações em `services.crud`: contadores, duplicadas e transição condicional.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from requests.models.processed_message import ProcessedMessage
+from requests.models.request import Request, RequestDecision, RequestStatusEnum
+from requests.models.request_counter import RequestCounter
+from services.crud import create_team_requests_in_db_batch, transition_pending_requests
+from shared.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+def approve_team_message(campus_code: str = "C1", team_id: uuid.UUID | None = None) -> dict:
+    return {
+        "team_id": str(team_id or uuid.uuid4()),
+        "campus_code": campus_code,
+        "request_type": "approve_team",
+        "competition_id": str(uuid.uuid4()),
+    }
+
+
+def add_member_message(campus_code: str = "C1", user_id: str = "20231012030015") -> dict:
+    return {
+        "team_id": str(uuid.uuid4()),
+        "campus_code": campus_code,
+        "request_type": "add_team_member",
+        "user_id": user_id,
+    }
+
+
+async def decide(campus_code: str, decisions: list[RequestDecision]) -> list[Request]:
+    async with AsyncSessionLocal() as db:
+        updated = await transition_pending_requests(db, campus_code, decisions)
+        await db.commit()
+        return updated
+
+
+async def counters() -> dict[tuple, int]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(RequestCounter))
+        return {
+            (row.campus_code, row.request_type, row.status): row.count
+            for row in result.scalars() if row.count
+        }
+
+
+async def actual_counts() -> dict[tuple, int]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Request.campus_code, Request.request_type, Request.status, func.count())
+            .group_by(Request.campus_code, Request.request_type, Request.status)
+        )
+        return {(campus_code, request_type, status): count for campus_code, request_type, status, count in result}
+
+
+async def request_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(Request))).scalar()
+
+
+async def test_counters_follow_create_and_decide(database):
+    results = await create_team_requests_in_db_batch(
+        [approve_team_message("C1") for _ in range(3)]
+        + [add_member_message("C1"), add_member_message("C2"), approve_team_message("C2")]
+    )
+    ids = [result["request_id"] for result in results]
+    assert await counters() == await actual_counts()
+
+    await decide("C1", [
+        RequestDecision(id=ids[0], status=RequestStatusEnum.approved),
+        RequestDecision(id=ids[1], status=RequestStatusEnum.rejected, reason_rejected="Equipe incompleta"),
+        RequestDecision(id=ids[3], status=RequestStatusEnum.approved),
+        # De outro campus: não é alterada nem contada
+        RequestDecision(id=ids[4], status=RequestStatusEnum.approved),
+    ])
+
+    current = await counters()
+    assert current == await actual_counts()
+    assert sum(current.values()) == 6
+
+
+async def test_transition_lost_race_changes_nothing(database):
+    results = await create_team_requests_in_db_batch([approve_team_message()])
+    request_id = results[0]["request_id"]
+
+    first = await decide("C1", [RequestDecision(id=request_id, status=RequestStatusEnum.approved)])
+    before = await counters()
+    second = await decide("C1", [RequestDecision(id=request_id, status=RequestStatusEnum.rejected)])
+
+    assert [request.id for request in first] == [request_id]
+    assert first[0].decided_at is not None
+    assert second == []
+    assert await counters() == before
+
+    async with AsyncSessionLocal() as db:
+        request = await db.get(Request, request_id)
+        assert request.status == RequestStatusEnum.approved
+
+
+async def test_batch_dedupes_pending_within_batch_and_across_batches(database):
+    team_id = uuid.uuid4()
+    message = approve_team_message(team_id=team_id)
+
+    first = await create_team_requests_in_db_batch([message, dict(message)], ["key-1", "key-2"])
+    assert first[0]["request_id"] == first[1]["request_id"]
+    assert await request_count() == 1
+
+    again = await create_team_requests_in_db_batch([dict(message)], ["key-3"])
+    assert again[0]["request_id"] == first[0]["request_id"]
+    assert again[0]["message"] == "Solicitação pendente já existente processada como duplicada."
+    assert await request_count() == 1
+    assert await counters() == await actual_counts()
+
+    # As duplicadas também são registradas, para que suas reentregas sejam descartadas
+    async with AsyncSessionLocal() as db:
+        keys = set((await db.execute(select(ProcessedMessage.message_key))).scalars())
+    assert keys == {"key-1", "key-2", "key-3"}
+
+
+async def test_batch_creates_new_request_after_previous_was_decided(database):
+    message = approve_team_message()
+    first = await create_team_requests_in_db_batch([message])
+    await decide("C1", [RequestDecision(id=first[0]["request_id"], status=RequestStatusEnum.rejected)])
+
+    second = await create_team_requests_in_db_batch([dict(message)])
+
+    assert second[0]["request_id"] != first[0]["request_id"]
+    assert await request_count() == 2
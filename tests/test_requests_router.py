@@ -0,0 +1,144 @@
+"""
+Rotas de solicitações: decisão concorrente, outbox na transação da decisão e paginação sobre o arquivo.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from requests.models.outbox_event import OutboxEvent
+from requests.models.request import ArchivedRequest, Request, RequestDecision, RequestStatusEnum
+from requests.routers import requests_router
+from services.crud import create_team_requests_in_db_batch, transition_pending_requests
+from services.request_archive import RequestArchiver
+from shared.database import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def audit_logs(monkeypatch):
+    # Os logs de auditoria iriam para o RabbitMQ
+    logs = []
+    monkeypatch.setattr(requests_router, "run_async_audit", logs.append)
+    return logs
+
+
+async def create_requests(count: int, campus_code: str = "C1") -> list[uuid.UUID]:
+    results = await create_team_requests_in_db_batch([
+        {
+            "team_id": str(uuid.uuid4()),
+            "campus_code": campus_code,
+            "request_type": "approve_team",
+            "competition_id": str(uuid.uuid4()),
+        }
+        for _ in range(count)
+    ])
+    return [result["request_id"] for result in results]
+
+
+async def decide(request_ids: list[uuid.UUID], status: RequestStatusEnum = RequestStatusEnum.approved) -> None:
+    async with AsyncSessionLocal() as db:
+        await transition_pending_requests(
+            db, "C1", [RequestDecision(id=request_id, status=status) for request_id in request_ids])
+        await db.commit()
+
+
+async def outbox_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(OutboxEvent))).scalar()
+
+
+async def test_decision_that_loses_the_race_returns_conflict(client, auth_headers):
+    request_id, = await create_requests(1)
+    # Outro organizador decidiu primeiro
+    await decide([request_id], RequestStatusEnum.rejected)
+
+    response = await client.put(f"/api/v1/requests/{request_id}", headers=auth_headers,
+                                json={"status": "approved"})
+    assert response.status_code == 409
+
+    response = await client.put(f"/api/v1/requests/{uuid.uuid4()}", headers=auth_headers,
+                                json={"status": "approved"})
+    assert response.status_code == 404
+
+    async with AsyncSessionLocal() as db:
+        request = await db.get(Request, request_id)
+    assert request.status == RequestStatusEnum.rejected
+    assert await outbox_count() == 0
+
+
+async def test_decision_writes_outbox_event(client, auth_headers, audit_logs):
+    request_id, = await create_requests(1)
+
+    response = await client.put(f"/api/v1/requests/{request_id}", headers=auth_headers,
+                                json={"status": "approved"})
+    assert response.status_code == 202
+
+    async with AsyncSessionLocal() as db:
+        request = await db.get(Request, request_id)
+        events = (await db.execute(select(OutboxEvent))).scalars().all()
+    assert request.status == RequestStatusEnum.approved
+    assert len(events) == 1
+    assert events[0].payload["team_id"] == str(request.team_id)
+    assert events[0].payload["status"] == "approved"
+
+    assert [log["event_type"] for log in audit_logs] == ["request.approved"]
+    assert audit_logs[0]["old_data"]["decided_at"] is None
+
+
+async def test_decision_is_rolled_back_with_its_outbox_event(client, auth_headers, monkeypatch):
+    request_id, = await create_requests(1)
+
+    def failing_outbox_event(db, routing_key, payload):
+        raise RuntimeError("falha ao registrar o evento")
+
+    monkeypatch.setattr(requests_router, "add_outbox_event", failing_outbox_event)
+
+    with pytest.raises(RuntimeError):
+        await client.put(f"/api/v1/requests/{request_id}", headers=auth_headers, json={"status": "approved"})
+
+    async with AsyncSessionLocal() as db:
+        request = await db.get(Request, request_id)
+    assert request.status == RequestStatusEnum.pendent
+    assert request.decided_at is None
+    assert await outbox_count() == 0
+
+
+async def test_listing_pages_across_active_and_archived_requests(client, auth_headers):
+    request_ids = await create_requests(7)
+    await create_requests(2, campus_code="C2")
+
+    archived_ids = request_ids[1:6:2]
+    await decide(archived_ids)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Request).where(Request.id.in_(archived_ids))
+            .values(decided_at=datetime.now(timezone.utc) - timedelta(days=60)))
+        await db.commit()
+
+    assert await RequestArchiver(archive_after_days=30).archive_batch() == len(archived_ids)
+
+    async with AsyncSessionLocal() as db:
+        assert (await db.execute(select(func.count()).select_from(ArchivedRequest))).scalar() == len(archived_ids)
+        rows = [
+            *(await db.execute(select(Request.created_at, Request.id).where(Request.campus_code == "C1"))).all(),
+            *(await db.execute(select(ArchivedRequest.created_at, ArchivedRequest.id))).all(),
+        ]
+
+    for sort, reverse in (("created_at_desc", True), ("created_at_asc", False)):
+        expected = [request_id for _, request_id in sorted(rows, reverse=reverse)]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, "sort": sort, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/v1/requests/", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            body = response.json()
+            seen.extend(uuid.UUID(item["id"]) for item in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == expected